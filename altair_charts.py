@@ -0,0 +1,47 @@
+import altair as alt
+import pandas as pd
+
+from fuel_cube import TIME_BUCKETS
+
+FUEL_COLORS = {
+    'Etanol': 'green',
+    'Gasolina': 'orange',
+    'Gasolina Aditivada': 'tomato',
+}
+
+FUEL_SCALE = alt.Scale(domain=list(FUEL_COLORS), range=list(FUEL_COLORS.values()))  # noqa: E501
+
+
+def bar_chart(data: pd.DataFrame,
+              column: str,
+              label: str,
+              title: str = '') -> alt.Chart:
+    return alt.Chart(data, title=title).mark_bar().encode(
+        x=alt.X('Produto:N', sort=list(FUEL_COLORS), axis=None),
+        y=alt.Y('Valor de Venda:Q', title='Valor Médio de Venda'),
+        color=alt.Color('Produto:N', scale=FUEL_SCALE, legend=alt.Legend(title=None)),  # noqa: E501
+        column=alt.Column(f'{column}:N', title=label),
+        tooltip=[
+            alt.Tooltip(f'{column}:N', title=label),
+            alt.Tooltip('Produto:N'),
+            alt.Tooltip('Valor de Venda:Q', format=',.3f')
+        ]
+    )
+
+
+def line_chart(data: pd.DataFrame, freq: str = 'D') -> alt.Chart:
+    _, date_format = TIME_BUCKETS[freq]
+    x = alt.X('Data da Coleta:T',
+              title='Data da Coleta',
+              axis=alt.Axis(format=date_format))
+
+    return alt.Chart(data).mark_line(point=True).encode(
+        x=x,
+        y=alt.Y('Valor de Venda:Q', title='Valor Médio de Venda', scale=alt.Scale(zero=False)),  # noqa: E501
+        color=alt.Color('Produto:N', scale=FUEL_SCALE, legend=alt.Legend(title=None)),  # noqa: E501
+        tooltip=[
+            alt.Tooltip('Data da Coleta:T', format=date_format),
+            alt.Tooltip('Produto:N'),
+            alt.Tooltip('Valor de Venda:Q', format=',.3f')
+        ]
+    )
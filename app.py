@@ -4,17 +4,23 @@ import streamlit as st
 from streamlit.elements import utils
 
 from custom_exceptions import ExcessValues
+from fuel_backend import FuelBackend
 from fuel_controller import FuelController
-from fuel_data import BASE_DIR, FuelData
-from settings import ABOUT_MSG, DATE_END, DATE_START
+from fuel_data import FuelData
+from fuel_dataset import BASE_DIR, open_dataset
+from memory_accounting import enforce_budget
+from profiling import start_run, stop_run
+from settings import ABOUT_MSG, PROFILING
 
 
 def clear_selections() -> None:
+    date_start, date_end = load_dataset().get_default_period()
+
     st.session_state.clear()
     st.session_state.update(
         [
-            ('inicial_date', DATE_START),
-            ('final_date', DATE_END),
+            ('inicial_date', date_start),
+            ('final_date', date_end),
             ('selected_regions', []),
             ('selected_states', []),
             ('selected_county', []),
@@ -25,9 +31,11 @@ def clear_selections() -> None:
     )
 
 
-@st.cache_data
-def load_data() -> FuelData:
-    return FuelData()
+# A single read-only copy of the data is shared by every session; each
+# rerun filters its own FuelData view over it.
+@st.cache_resource
+def load_dataset() -> FuelBackend:
+    return open_dataset()
 
 
 if __name__ == '__main__':
@@ -46,7 +54,9 @@ if __name__ == '__main__':
         }
     )
 
-    fdt = load_data()
+    records = start_run() if PROFILING else None
+
+    fdt = FuelData(dataset=load_dataset())
     fcl = FuelController(fdt)
 
     st.title(
@@ -57,7 +67,11 @@ if __name__ == '__main__':
     with st.sidebar:
         st.title(':ballot_box_with_check: Dados de Seleção')
 
-        st.markdown('Período Análisado: ***2º Semestre de 2022***')
+        min_date, max_date = fdt.get_date_bounds()
+
+        st.markdown(
+            f'Período Análisado: ***{min_date:%d/%m/%Y} a {max_date:%d/%m/%Y}***'  # noqa: E501
+        )
 
         # Container for inicial date and final date widgets
         with st.container():
@@ -143,6 +157,9 @@ if __name__ == '__main__':
 
             with st.container():
                 col1, col2, col3, col4, col5 = st.columns(5)
+                metrics = fdt.get_metrics()
+                products = metrics.products
+                cost_benefit = metrics.cost_benefit
 
                 with col1:
                     msg_help = '''
@@ -150,9 +167,8 @@ if __name__ == '__main__':
                     '''
 
                     st.metric('ETANOL',
-                              fdt.get_min_sale_value_of_product('ETANOL'),
-                              delta=fdt.get_max_sale_value_of_product(
-                                  'ETANOL'),
+                              products['ETANOL'].min,
+                              delta=products['ETANOL'].max,
                               delta_color="normal",
                               help=msg_help,
                               label_visibility="visible")
@@ -162,9 +178,8 @@ if __name__ == '__main__':
                     '''
 
                     st.metric('GASOLINA',
-                              fdt.get_min_sale_value_of_product('GASOLINA'),
-                              delta=fdt.get_max_sale_value_of_product(
-                                  'GASOLINA'),
+                              products['GASOLINA'].min,
+                              delta=products['GASOLINA'].max,
                               delta_color="normal",
                               help=msg_help,
                               label_visibility="visible")
@@ -176,10 +191,8 @@ if __name__ == '__main__':
                     '''
 
                     st.metric('GASOLINA ADITIVADA',
-                              fdt.get_min_sale_value_of_product(
-                                  'GASOLINA ADITIVADA'),
-                              delta=fdt.get_max_sale_value_of_product(
-                                  'GASOLINA ADITIVADA'),
+                              products['GASOLINA ADITIVADA'].min,
+                              delta=products['GASOLINA ADITIVADA'].max,
                               delta_color="normal",
                               help=msg_help,
                               label_visibility="visible")
@@ -193,8 +206,8 @@ if __name__ == '__main__':
 
                     st.metric(
                         'ETANOL x GASOLINA',
-                        fdt.get_ethanol_cost_benefit(operation='Mínimo'),
-                        delta=fdt.get_ethanol_cost_benefit(operation='Máximo'),
+                        cost_benefit['GASOLINA']['Mínimo'],
+                        delta=cost_benefit['GASOLINA']['Máximo'],
                         delta_color='normal',
                         help=msg_help,
                         label_visibility='visible'
@@ -209,10 +222,8 @@ if __name__ == '__main__':
 
                     st.metric(
                         'ETANOL x GAS. ADITIVADA',
-                        fdt.get_ethanol_cost_benefit(
-                            'GASOLINA ADITIVADA', 'Mínimo'),
-                        delta=fdt.get_ethanol_cost_benefit(
-                            'GASOLINA ADITIVADA', 'Máximo'),
+                        cost_benefit['GASOLINA ADITIVADA']['Mínimo'],
+                        delta=cost_benefit['GASOLINA ADITIVADA']['Máximo'],
                         delta_color='normal',
                         help=msg_help,
                         label_visibility='visible'
@@ -236,7 +247,7 @@ if __name__ == '__main__':
                     brasileiras.*
                     '''
                 )
-                fdt.get_chart_sales_value_by_region(st.pyplot)
+                fcl.chart('region')
 
             with st.expander('**Comparativo por Estado e Região Brasileira**'):
                 st.markdown(
@@ -252,7 +263,7 @@ if __name__ == '__main__':
                     (ANP) referentes ao perído selecionado.*
                     '''
                 )
-                fdt.get_chart_sales_value_by_regions_and_states(st.pyplot)
+                fcl.chart('regions_and_states')
 
             with st.expander('**Comparativo por Cidades Brasileiras**'):
                 st.markdown(
@@ -266,7 +277,7 @@ if __name__ == '__main__':
                 )
 
                 try:
-                    st.pyplot(fdt.get_chart_sales_value_by_cities())
+                    fcl.chart('cities')
                 except ExcessValues as e:
                     st.warning(e, icon="⚠️")
 
@@ -288,7 +299,7 @@ if __name__ == '__main__':
                 )
 
                 try:
-                    st.pyplot(fdt.get_chart_sales_value_by_flags())
+                    fcl.chart('flags')
                 except ExcessValues as e:
                     st.warning(e, icon="⚠️")
 
@@ -311,7 +322,7 @@ if __name__ == '__main__':
                     aberto.*
                     '''
                 )
-                st.pyplot(fdt.get_chart_evolution_of_sales_values_over_time())
+                fcl.chart('evolution')
 
         # with tab2:
         #     st.markdown('# Evolução dos Valores dos Combustíveis')
@@ -322,8 +333,17 @@ if __name__ == '__main__':
                        'Data da Coleta', 'Valor de Venda', 'Valor de Compra',
                        'Bandeira']
 
-            st.dataframe(fdt.get_dataframe(columns, True, True),
-                         use_container_width=True)
+            if fcl.section_active('spreadsheet', 'Exibir planilha'):
+                fcl.paginated_table(columns)
+
+            fcl.export_button(columns)
 
             st.write(
                 f'Total de registros: {fdt.get_amount_records()}')
+
+    if records is not None:
+        stop_run()
+        fcl.profiling_panel(records)
+        fcl.memory_panel()
+
+    enforce_budget(load_dataset())
@@ -0,0 +1,295 @@
+import argparse
+import html
+import json
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import matplotlib
+
+from custom_exceptions import ExcessValues
+from fuel_backend import FuelBackend
+from fuel_data import FuelData
+from fuel_dataset import STORAGE_BACKENDS, open_dataset
+from settings import REPORT_DPI, STORAGE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+CHART_KINDS = ['region', 'regions_and_states', 'cities', 'flags', 'evolution']
+
+CHART_TITLES = {
+    'region': 'Valores médios de venda por região',
+    'regions_and_states': 'Valores médios de venda por estado',
+    'cities': 'Valores médios de venda por município',
+    'flags': 'Valores médios de venda por bandeira',
+    'evolution': 'Evolução dos valores médios de venda'
+}
+
+# Days of each period window, ending at the latest collection.
+PERIOD_WINDOWS = [7, 30, 90]
+
+# Dataset of the worker process, loaded once by its initializer, and the
+# renderer processes its state charts are drawn by.
+_dataset = None
+_render_workers = None
+
+
+def init_worker(source: Path | None,
+                backend: str,
+                render_workers: int | None) -> None:
+    global _dataset, _render_workers
+
+    matplotlib.use('Agg')
+    _dataset = open_dataset(source, backend)
+    _render_workers = render_workers
+
+
+def empty_sets() -> dict:
+    return {
+        'cities': None,
+        'flags': None,
+        'fuels': None,
+        'period': None,
+        'regions': None,
+        'resales': None,
+        'states': None
+    }
+
+
+def window_specs(dataset: FuelBackend,
+                 scopes: list[str],
+                 windows: list[int]) -> list[dict]:
+    fdt = FuelData(dataset=dataset)
+    max_date = dataset.get_date_bounds()[1]
+    values = {
+        'regions': fdt.get_regions().tolist(),
+        'states': fdt.get_states().tolist()
+    }
+    specs = []
+
+    for days in windows:
+        period = (max_date - timedelta(days=days - 1), max_date)
+
+        for scope in scopes:
+            for value in values[scope]:
+                sets = empty_sets()
+                sets.update({scope: [value], 'period': period})
+                specs.append({'name': f'{scope}-{value}-{days}d', 'sets': sets})  # noqa: E501
+
+    return specs
+
+
+def load_specs(path: Path) -> list[dict]:
+    # A JSON list of {"name": ..., "sets": {...}}; the omitted keys of sets
+    # are not filtered and period is a pair of ISO dates.
+    with open(path, encoding='utf-8') as source:
+        items = json.load(source)
+
+    specs = []
+
+    for item in items:
+        sets = empty_sets()
+        sets.update(item.get('sets', {}))
+
+        if sets['period'] is not None:
+            sets['period'] = tuple(datetime.fromisoformat(value)
+                                   for value in sets['period'])
+
+        specs.append({'name': str(item['name']), 'sets': sets})
+
+    return specs
+
+
+def spec_json(sets: dict) -> dict:
+    return {
+        key: [value.isoformat() for value in values] if key == 'period' and values else values  # noqa: E501
+        for key, values in sets.items()
+    }
+
+
+def run_report(spec: dict,
+               output: Path,
+               kinds: list[str],
+               dpi: int,
+               formats: list[str]) -> dict:
+    start = time.perf_counter()
+    folder = output / spec['name']
+    folder.mkdir(parents=True, exist_ok=True)
+
+    # Filters narrow the view they are applied to, so every report starts
+    # from a view of its own over the shared dataset.
+    fdt = FuelData(dataset=_dataset)
+    sets = dict(spec['sets'])
+    fdt.set_fuel(sets, inplace=True)
+
+    entry = {
+        'name': spec['name'],
+        'sets': spec_json(sets),
+        'records': fdt.get_amount_records(),
+        'metrics': asdict(fdt.get_metrics()),
+        'charts': {},
+        'skipped': {}
+    }
+
+    for kind in kinds if entry['records'] > 0 else []:
+        try:
+            images = fdt.get_chart_images(kind, dpi, _render_workers)
+        except ExcessValues as error:
+            entry['skipped'][kind] = str(error)
+            continue
+
+        entry['charts'][kind] = []
+
+        for number, image in enumerate(images):
+            path = folder / f'{kind}-{number}.png'
+            path.write_bytes(image)
+            entry['charts'][kind].append(str(path.relative_to(output)))
+
+    if 'html' in formats:
+        path = folder / 'index.html'
+        path.write_text(report_html(entry), encoding='utf-8')
+        entry['html'] = str(path.relative_to(output))
+
+    entry['seconds'] = round(time.perf_counter() - start, 3)
+
+    return entry
+
+
+def report_html(entry: dict) -> str:
+    metrics = entry['metrics']
+    rows = ''.join(
+        f'<tr><td>{html.escape(produto)}</td><td>{values["min"]}</td>'
+        f'<td>{values["max"]}</td><td>{values["mean"]}</td></tr>'
+        for produto, values in metrics['products'].items()
+    )
+    ratios = ''.join(
+        f'<li>Etanol x {html.escape(fuel.title())} ({html.escape(operation)}): {value}</li>'  # noqa: E501
+        for fuel, operations in metrics['cost_benefit'].items()
+        for operation, value in operations.items()
+    )
+    charts = ''.join(
+        f'<h2>{CHART_TITLES[kind]}</h2>'
+        + ''.join(f'<img src="{Path(path).name}" alt="{kind}">' for path in paths)  # noqa: E501
+        for kind, paths in entry['charts'].items()
+    )
+    filters = ''.join(
+        f'<li>{key}: {html.escape(", ".join(map(str, value)))}</li>'
+        for key, value in entry['sets'].items() if value is not None
+    )
+
+    return (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<title>{html.escape(entry["name"])}</title>'
+        '<style>body{font-family:sans-serif;margin:2em}img{max-width:100%}'
+        'td,th{padding:.2em .8em;text-align:right}</style></head><body>'
+        f'<h1>{html.escape(entry["name"])}</h1><ul>{filters}</ul>'
+        f'<p>Total de registros: {entry["records"]}</p>'
+        '<table><tr><th>Produto</th><th>Mínimo</th><th>Máximo</th>'
+        f'<th>Médio</th></tr>{rows}</table><ul>{ratios}</ul>{charts}'
+        '</body></html>'
+    )
+
+
+def batch_report(specs: list[dict],
+                 output: Path,
+                 source: Path | None = None,
+                 kinds: list[str] = CHART_KINDS,
+                 dpi: int = REPORT_DPI,
+                 formats: list[str] = ['png', 'html'],
+                 max_workers: int | None = None,
+                 backend: str = STORAGE_BACKEND) -> dict:
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    entries = {}
+    errors = {}
+
+    # Every report already runs in its own process, so the state charts are
+    # not drawn by a further pool of renderers.
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_worker,
+                             initargs=(source, backend, 1)) as pool:
+        futures = {
+            pool.submit(run_report, spec, output, kinds, dpi, formats): spec['name']  # noqa: E501
+            for spec in specs
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+
+            try:
+                entries[name] = future.result()
+                logger.info('%s: %.1f s', name, entries[name]['seconds'])
+            except Exception as error:
+                errors[name] = repr(error)
+                logger.error('%s failed: %r', name, error)
+
+    manifest = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'source': str(source) if source is not None else None,
+        'backend': backend,
+        'dpi': dpi,
+        'seconds': round(time.perf_counter() - start, 3),
+        'reports': [entries[spec['name']] for spec in specs if spec['name'] in entries],  # noqa: E501
+        'errors': errors
+    }
+
+    with open(output / 'manifest.json', 'w', encoding='utf-8') as target:
+        json.dump(manifest, target, ensure_ascii=False, indent=2)
+
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Write the dashboard metrics and charts of every filter'
+                    ' spec as PNG/HTML reports, with a manifest.json.')
+    parser.add_argument('output', type=Path, help='folder of the reports')
+    parser.add_argument('--source', type=Path, default=None,
+                        help='ANP CSV file or folder; the base folder by default')  # noqa: E501
+    parser.add_argument('--backend', choices=list(STORAGE_BACKENDS),
+                        default=STORAGE_BACKEND)
+    parser.add_argument('--specs', type=Path, default=None,
+                        help='JSON list of {"name": ..., "sets": {...}}')
+    parser.add_argument('--by', nargs='*', choices=['regions', 'states'],
+                        default=None,
+                        help='one report per region and/or state and window')
+    parser.add_argument('--windows', nargs='+', type=int, default=PERIOD_WINDOWS,  # noqa: E501
+                        help='days of each period window')
+    parser.add_argument('--kinds', nargs='+', choices=CHART_KINDS,
+                        default=CHART_KINDS)
+    parser.add_argument('--formats', nargs='+', choices=['png', 'html'],
+                        default=['png', 'html'])
+    parser.add_argument('--dpi', type=int, default=REPORT_DPI)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    # Loading once here also builds the Parquet cache or the SQLite database
+    # the workers read.
+    dataset = open_dataset(args.source, args.backend)
+    specs = load_specs(args.specs) if args.specs is not None else []
+
+    if args.by or args.specs is None:
+        specs += window_specs(dataset, args.by or ['regions', 'states'], args.windows)  # noqa: E501
+
+    del dataset
+
+    manifest = batch_report(specs,
+                            args.output,
+                            args.source,
+                            args.kinds,
+                            args.dpi,
+                            args.formats,
+                            args.workers,
+                            args.backend)
+
+    print(f"{len(manifest['reports'])} reports, {len(manifest['errors'])}"
+          f" errors in {manifest['seconds']:.1f} s: {args.output / 'manifest.json'}")  # noqa: E501
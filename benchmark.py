@@ -0,0 +1,289 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from timeit import repeat
+from typing import Any, Callable
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from custom_exceptions import ExcessValues
+from fuel_data import FuelData
+from settings import PREVIEW_DPI
+from synthetic_data import generate, parse_size
+from tools import word_capitalize
+
+matplotlib.use('Agg')
+
+
+def filter_scenarios(fdt: FuelData) -> dict:
+    frame = fdt.set_fuel(None)
+    period = fdt.get_default_period()
+
+    def top(column: str, amount: int = 1, data: pd.DataFrame = frame) -> list:
+        return data[column].value_counts().index[:amount].tolist()
+
+    state = top('Estado - Sigla')
+    in_state = frame[frame['Estado - Sigla'].isin(state)]
+
+    def sets(**values) -> dict:
+        base = {
+            'cities': None,
+            'flags': None,
+            'fuels': None,
+            'period': period,
+            'regions': None,
+            'resales': None,
+            'states': None
+        }
+        base.update(values)
+        return base
+
+    return {
+        'period': sets(),
+        'region': sets(regions=top('Regiao - Sigla')),
+        'states': sets(states=top('Estado - Sigla', 2)),
+        'city': sets(states=state, cities=top('Municipio', 1, in_state)),
+        'resale': sets(resales=top('Revenda')),
+        'fuels + flags': sets(fuels=['ETANOL', 'GASOLINA'],
+                              flags=top('Bandeira', 3)),
+        'all dimensions': sets(regions=top('Regiao - Sigla', 1, in_state),
+                               states=state,
+                               cities=top('Municipio', 4, in_state),
+                               fuels=['ETANOL'],
+                               flags=top('Bandeira', 2, in_state))
+    }
+
+
+def benchmark_set_fuel(fdt: FuelData, number: int = 20) -> pd.DataFrame:
+    cache = fdt.get_dataset().get_cache()
+    results = {}
+
+    # The index engine keeps its rows in the shared result cache, so it is
+    # cleared before every call for both engines to do the same work.
+    def uncached(sets: dict, engine: str) -> None:
+        cache.clear()
+        fdt.set_fuel(dict(sets), engine=engine)
+
+    for name, sets in filter_scenarios(fdt).items():
+        timings = {}
+
+        for engine in ['query', 'index']:
+            best = min(repeat(lambda: uncached(sets, engine),
+                              number=number,
+                              repeat=3))
+            timings[f'{engine}_ms'] = best / number * 1000
+
+        timings['rows'] = fdt.set_fuel(dict(sets)).shape[0]
+        results[name] = timings
+
+    report = pd.DataFrame(results).T
+    report['speedup'] = report['query_ms'] / report['index_ms']
+
+    return report.round(3)
+
+
+def benchmark_labels(fdt: FuelData, number: int = 20) -> pd.DataFrame:
+    labels = fdt.get_labels()
+    frame = fdt.get_dataset().get_frame()
+    columns = ['Municipio', 'Revenda', 'Produto', 'Bandeira']
+
+    # What a rerun formats: every widget option and the capitalized columns.
+    options = {
+        'Municipio': fdt.get_cities(),
+        'Revenda': fdt.get_resales(option_all=False),
+        'Produto': fdt.get_fuels(),
+        'Bandeira': fdt.get_flags()
+    }
+
+    def widgets_before() -> None:
+        for values in options.values():
+            [word_capitalize(value) for value in values]
+
+    def widgets_after() -> None:
+        for column, values in options.items():
+            formatter = labels.get_formatter(column)
+            [formatter(value) for value in values]
+
+    def rows_before() -> None:
+        for column in columns:
+            frame[column].astype(object).map(word_capitalize)
+
+    def categories_before() -> None:
+        for column in columns:
+            frame[column].map(word_capitalize)
+
+    def rows_after() -> None:
+        for column in columns:
+            labels.relabel(frame[column])
+
+    scenarios = {
+        'widget options': (widgets_before, widgets_after),
+        'columns, per row': (rows_before, rows_after),
+        'columns, per category': (categories_before, rows_after)
+    }
+    results = {}
+
+    for name, (before, after) in scenarios.items():
+        timings = {}
+
+        for label, function in [('before_ms', before), ('after_ms', after)]:
+            best = min(repeat(function, number=number, repeat=3))
+            timings[label] = best / number * 1000
+
+        results[name] = timings
+
+    report = pd.DataFrame(results).T
+    report['speedup'] = report['before_ms'] / report['after_ms']
+
+    return report.round(3)
+
+
+def timed(function: Callable, number: int = 5) -> float:
+    return min(repeat(function, number=number, repeat=3)) / number * 1000
+
+
+def benchmark_suite(source: Path | None = None, number: int = 5) -> dict:
+    records = []
+
+    def record(group: str, name: str, **timings) -> None:
+        records.append({'group': group, 'name': name, **timings})
+
+    # Loading: parsing the CSV files, then reading the typed cache back.
+    start = time.perf_counter()
+    fdt = FuelData(source, rebuild_cache=True)
+    record('init', 'FuelData (parse)',
+           ms=(time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    fdt = FuelData(source)
+    record('init', 'FuelData (cache)',
+           ms=(time.perf_counter() - start) * 1000)
+
+    dataset = fdt.get_dataset()
+    cache = dataset.get_cache()
+
+    # Cold timings clear the shared result cache before every call; warm
+    # timings answer from it, as a rerun with unchanged filters does.
+    def cold(function: Callable) -> Callable:
+        def run() -> Any:
+            cache.clear()
+            dataset.get_render_cache().clear()
+            return function()
+
+        return run
+
+    for name, sets in filter_scenarios(fdt).items():
+        view = FuelData(dataset=dataset)
+        record('set_fuel', name,
+               cold_ms=timed(cold(lambda: view.set_fuel(dict(sets))), number),
+               warm_ms=timed(lambda: view.set_fuel(dict(sets)), number),
+               rows=view.set_fuel(dict(sets)).shape[0])
+
+    for name, row in benchmark_set_fuel(fdt, number).iterrows():
+        record('set_fuel engines', str(name), **row.to_dict())
+
+    for name, row in benchmark_labels(fdt, number).iterrows():
+        record('labels', str(name), **row.to_dict())
+
+    options = {
+        'get_regions': fdt.get_regions,
+        'get_states': lambda: fdt.get_states(['SE']),
+        'get_cities': lambda: fdt.get_cities(['SP']),
+        'get_resales': fdt.get_resales,
+        'get_fuels': fdt.get_fuels,
+        'get_flags': fdt.get_flags
+    }
+
+    for name, function in options.items():
+        record('options', name,
+               cold_ms=timed(cold(function), number),
+               warm_ms=timed(function, number))
+
+    view = FuelData(dataset=dataset)
+    view.set_fuel(None, inplace=True)
+
+    record('metrics', 'get_metrics',
+           cold_ms=timed(cold(view.get_metrics), number),
+           warm_ms=timed(view.get_metrics, number))
+
+    def figures(function: Callable) -> Callable:
+        def run() -> None:
+            try:
+                function()
+            except ExcessValues:
+                pass
+
+            plt.close('all')
+
+        return run
+
+    charts = {
+        'get_chart_sales_value_by_region':
+            lambda: view.get_chart_sales_value_by_region(lambda fig: None),
+        'get_chart_sales_value_by_regions_and_states':
+            lambda: view.get_chart_sales_value_by_regions_and_states(lambda fig: None),  # noqa: E501
+        'get_chart_sales_value_by_cities':
+            view.get_chart_sales_value_by_cities,
+        'get_chart_sales_value_by_flags':
+            view.get_chart_sales_value_by_flags,
+        'get_chart_evolution_of_sales_values_over_time':
+            view.get_chart_evolution_of_sales_values_over_time
+    }
+
+    for name, function in charts.items():
+        record('charts', name,
+               cold_ms=timed(cold(figures(function)), 1),
+               warm_ms=timed(figures(function), 1))
+
+    for kind in ['region', 'regions_and_states', 'evolution']:
+        function = figures(lambda: view.get_chart_images(kind, PREVIEW_DPI))
+        record('images', f'{kind} ({PREVIEW_DPI} dpi)',
+               cold_ms=timed(cold(function), 1),
+               warm_ms=timed(function, 1))
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'source': str(source) if source is not None else None,
+            'records': fdt.get_amount_records(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'cpus': os.cpu_count()
+        },
+        'results': records
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time loading, filtering, metrics and charts.')
+    parser.add_argument('source', nargs='?', type=Path,
+                        help='ANP file or folder (default: the data folder)')
+    parser.add_argument('--rows', type=parse_size,
+                        help='benchmark a synthetic file of this many rows')
+    parser.add_argument('--output', type=Path, default=Path('benchmark.json'),
+                        help='JSON file receiving the results')
+    parser.add_argument('--number', type=int, default=5,
+                        help='calls per timing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = args.source
+
+        if args.rows is not None:
+            source = generate(Path(directory) / 'ca-synthetic.csv', args.rows)
+
+        results = benchmark_suite(source, args.number)
+
+    args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    report = pd.DataFrame(results['results']).set_index(['group', 'name'])
+    print(f"Records: {results['meta']['records']}")
+    print(report.round(3).to_string())
@@ -0,0 +1,262 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Union
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+from numpy import arange
+from typing_extensions import TypeAlias
+
+from tools import currency_format, word_capitalize
+
+logger = logging.getLogger(__name__)
+
+DataValue: TypeAlias = Union['pd.DataFrame', 'pd.Series']
+StringValue: TypeAlias = Union[str, None]
+
+# Pool of Agg renderers shared by every session, started on first use.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def plot_bar(df: DataValue,
+             suptitle: StringValue = None,
+             display_bar_label: bool = False,
+             chart_break: bool = False,
+             labels: dict | None = None) -> plt.Figure:
+
+    if isinstance(df, pd.Series):
+        df = pd.DataFrame(df)
+    else:
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError(
+                f"'{str(df)}' is of type {str(type(df))}, which is not an accepted type."  # noqa: E501
+                " value only accepts: pandas.DataFrame or pandas.Series"
+                " Please convert the value to an accepted type."
+            )
+
+    if not isinstance(display_bar_label, bool):
+        raise TypeError(
+            f"'{str(display_bar_label)}' is of type {str(type(display_bar_label))}, which is not an accepted type."  # noqa: E501
+            " value only accepts: bool"
+            " Please convert the value to an accepted type."
+        )
+
+    if not isinstance(chart_break, bool):
+        raise TypeError(
+            f"'{str(chart_break)}' is of type {str(type(chart_break))}, which is not an accepted type."  # noqa: E501
+            " value only accepts: bool"
+            " Please convert the value to an accepted type."
+        )
+
+    if not isinstance(suptitle, str) and suptitle is not None:
+        raise TypeError(
+            f"'{str(suptitle)}' is of type {str(type(suptitle))}, which is not an accepted type."  # noqa: E501
+            " value only accepts: str or None"
+            " Please convert the value to an accepted type."
+        )
+
+    # Legend labels come from the label registry when given.
+    legends = {
+        column: labels.get(column, column) if labels is not None
+        else word_capitalize(column)
+        for column in df.columns
+    }
+
+    plt.style.use('Solarize_Light2')
+
+    bar_width = 0.25
+    fs_bar_label = 9
+    fs_legend = 10
+    fs_label = 10
+    fs_ticks = 10
+
+    bar_colors = {
+        'ETANOL': 'green',
+        'GASOLINA': 'orange',
+        'GASOLINA ADITIVADA': 'tomato',
+    }
+
+    if df.shape[0] > 4 and chart_break:
+        fig, (ax, ax1) = plt.subplots(
+            2,
+            1,
+            figsize=(11.3, 12),
+            layout='tight',
+            dpi=600
+        )
+    else:
+        fig, ax = plt.subplots(
+            1,
+            1,
+            figsize=(11.3, 6),
+            layout='tight',
+            dpi=600
+        )
+
+    x = [p - bar_width for p in arange(len(df.index))]
+
+    for column in df.columns:
+        h = df[column]
+        x = [p + bar_width for p in x]
+
+        if df.shape[0] > 4 and chart_break:
+            bar_container = ax.bar(x[:4],
+                                   h[:4],
+                                   color=bar_colors[column],
+                                   width=bar_width,
+                                   edgecolor='white',
+                                   linewidth=0.8,
+                                   label=legends[column])
+
+            bar_container1 = ax1.bar(x[4:],
+                                     h[4:],
+                                     color=bar_colors[column],
+                                     width=bar_width,
+                                     edgecolor='white',
+                                     linewidth=0.8,
+                                     label=legends[column])
+
+            if display_bar_label:
+                ax.bar_label(bar_container,
+                             fmt=currency_format,
+                             padding=1,
+                             rotation=30,
+                             fontweight='light',
+                             fontsize=fs_bar_label)
+
+                ax1.bar_label(bar_container1,
+                              fmt=currency_format,
+                              padding=1,
+                              rotation=30,
+                              fontweight='light',
+                              fontsize=fs_bar_label)
+        else:
+            bar_container = ax.bar(x,
+                                   h,
+                                   color=bar_colors[column],
+                                   width=bar_width,
+                                   edgecolor='white',
+                                   linewidth=0.8,
+                                   label=legends[column])
+            if display_bar_label:
+                ax.bar_label(bar_container,
+                             fmt=currency_format,
+                             padding=1,
+                             rotation=30,
+                             fontweight='light',
+                             fontsize=fs_bar_label)
+
+    ax.set_xlabel('Estado(s)', fontweight='book', fontsize=fs_label)
+
+    if df.shape[0] > 4 and chart_break:
+        ax1.set_xlabel('Estado(s)', fontweight='book', fontsize=fs_label)
+
+    ax.set_ylabel('Valor Médio de Venda',
+                  fontweight='book', fontsize=fs_label)
+
+    if len(df.columns) > 2:
+        x = [p - bar_width for p in x]
+    elif len(df.columns) % 2 == 0:
+        x = [p - (bar_width / 2) for p in x]
+
+    if df.shape[0] > 4 and chart_break:
+        ax.set_xticks(x[:4],
+                      df.index[:4],
+                      fontsize=fs_ticks,
+                      fontweight='regular')
+
+        ax1.set_xticks(x[4:],
+                       df.index[4:],
+                       fontsize=fs_ticks,
+                       fontweight='regular')
+
+        ax.set_yticks([v for v in arange(0, 8, 0.5)],
+                      [str(v) for v in arange(0, 8, 0.5)],
+                      fontsize=fs_ticks,
+                      fontweight='regular')
+
+        ax1.set_yticks([v for v in arange(0, 8, 0.5)],
+                       [str(v) for v in arange(0, 8, 0.5)],
+                       fontsize=fs_ticks,
+                       fontweight='regular')
+    else:
+        ax.set_xticks(x,
+                      df.index,
+                      fontsize=fs_ticks,
+                      fontweight='regular')
+
+        ax.set_yticks([v for v in arange(0, 8, 0.5)],
+                      [str(v) for v in arange(0, 8, 0.5)],
+                      fontsize=fs_ticks,
+                      fontweight='regular')
+
+    if suptitle is not None:
+        fig.suptitle(suptitle)
+
+    handles, labels = ax.get_legend_handles_labels()
+    fig.legend(handles=handles, labels=labels, fontsize=fs_legend)
+
+    return fig
+
+
+def render_bar(df: DataValue,
+               suptitle: StringValue = None,
+               display_bar_label: bool = False,
+               chart_break: bool = False,
+               dpi: int = 600,
+               labels: dict | None = None) -> bytes:
+    figure = plot_bar(df, suptitle, display_bar_label, chart_break, labels)
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png', dpi=dpi)
+    plt.close(figure)
+    return buffer.getvalue()
+
+
+def init_renderer() -> None:
+    matplotlib.use('Agg')
+
+
+def render_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_renderer
+            )
+
+        return _pool
+
+
+def render_bars(sheets: list[tuple[DataValue, StringValue]],
+                dpi: int = 600,
+                max_workers: int | None = None,
+                labels: dict | None = None) -> list[bytes]:
+    global _pool
+
+    # Each sheet is drawn by a separate process and collected in order.
+    pool = render_pool(max_workers)
+
+    try:
+        futures = [
+            pool.submit(render_bar, sheet, suptitle, True, True, dpi, labels)
+            for sheet, suptitle in sheets
+        ]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        logger.warning('Chart renderer pool stopped; drawing in process.')
+
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+
+        return [render_bar(sheet, suptitle, True, True, dpi, labels)
+                for sheet, suptitle in sheets]
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+from typing import Callable
+
+import numpy as np
+import pytest
+
+from fuel_dataset import FuelDataset
+from fuel_index import DIMENSIONS
+from synthetic_data import generate
+
+
+@pytest.fixture(scope='session')
+def survey(tmp_path_factory: pytest.TempPathFactory):
+    # A small ANP semester file; the loaders write their caches next to it.
+    folder = tmp_path_factory.mktemp('survey')
+    return generate(folder / 'ca-2022-02.csv',
+                    20_000,
+                    date(2022, 7, 1),
+                    date(2022, 12, 31),
+                    seed=7)
+
+
+@pytest.fixture(scope='session')
+def reference(survey) -> FuelDataset:
+    return FuelDataset(survey)
+
+
+@pytest.fixture(scope='session')
+def random_sets(reference) -> Callable[[int, bool], dict]:
+    # Random set_fuel filters over the survey values, for the whole period
+    # or a narrower one; resales are filtered less often, since a handful
+    # of them rarely matches the other filters.
+    frame = reference.get_frame()
+    min_date, max_date = reference.get_date_bounds()
+
+    def sets(seed: int, whole: bool = True) -> dict:
+        rng = np.random.default_rng(seed)
+
+        if whole:
+            sets = {'period': (min_date, max_date)}
+        else:
+            start = min_date + timedelta(days=int(rng.integers(0, 90)))
+            sets = {'period': (start, start + timedelta(days=int(rng.integers(7, 90))))}  # noqa: E501
+
+        for key, column in DIMENSIONS.items():
+            if rng.random() < (0.9 if key == 'resales' else 0.5):
+                sets[key] = None
+                continue
+
+            values = frame[column].cat.categories
+            sets[key] = rng.choice(values, rng.integers(1, 4)).tolist()
+
+        return sets
+
+    return sets
@@ -0,0 +1,66 @@
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Write-only file handed to pyarrow: it keeps the written bytes until they
+# are drained, while tell() reports the position in the whole output as the
+# Parquet footer expects.
+class ChunkSink():
+
+    # Constructor
+    def __init__(self) -> None:
+        self.__parts = []
+        self.__position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self.__parts.append(bytes(data))
+        self.__position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.__position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self.__parts)
+        self.__parts = []
+        return data
+
+
+def csv_chunks(chunks: Iterator[pd.DataFrame],
+               decimal: str = ',') -> Iterator[bytes]:
+    header = True
+
+    for chunk in chunks:
+        yield chunk.to_csv(sep=';',
+                           decimal=decimal,
+                           index=False,
+                           header=header,
+                           date_format='%d/%m/%Y').encode('utf-8')
+        header = False
+
+
+def parquet_chunks(chunks: Iterator[pd.DataFrame],
+                   schema: pa.Schema) -> Iterator[bytes]:
+    sink = ChunkSink()
+
+    # Every chunk becomes a row group that is sent as soon as it is written.
+    with pq.ParquetWriter(pa.PythonFile(sink, mode='w'),
+                          schema,
+                          compression='zstd') as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk,
+                                                    schema=schema,
+                                                    preserve_index=False))
+            yield sink.drain()
+
+    yield sink.drain()
@@ -0,0 +1,361 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+from settings import CSV_CHUNK_SIZE, SOURCE_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the cleaning pipeline changes so old cache files are rebuilt.
+CACHE_VERSION = 3
+CACHE_DIR_NAME = '.cache'
+CACHE_METADATA_KEY = b'fuel_analysis'
+HASH_CHUNK_SIZE = 1 << 20
+
+CATEGORY_COLUMNS = [
+    'Regiao - Sigla',
+    'Estado - Sigla',
+    'Municipio',
+    'Revenda',
+    'CNPJ da Revenda',
+    'Produto',
+    'Bandeira'
+]
+
+PRICE_COLUMNS = ['Valor de Venda', 'Valor de Compra']
+
+# Columns read from the ANP file, in the order the frame exposes them.
+SOURCE_COLUMNS = [
+    'Regiao - Sigla',
+    'Estado - Sigla',
+    'Municipio',
+    'Revenda',
+    'CNPJ da Revenda',
+    'Produto',
+    'Data da Coleta',
+    'Valor de Venda',
+    'Valor de Compra',
+    'Bandeira'
+]
+
+PRODUCTS = ['GASOLINA', 'GASOLINA ADITIVADA', 'ETANOL']
+
+
+def clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[df['Produto'].isin(PRODUCTS)].copy()
+
+    df['Data da Coleta'] = pd.to_datetime(
+        df['Data da Coleta'],
+        exact=True,
+        dayfirst=True,
+        infer_datetime_format=True,
+        format='%d/%m/%Y',
+        errors='coerce'
+    )
+
+    df['Valor de Venda'] = df['Valor de Venda'].str.replace(
+        ',',
+        '.',
+        regex=False
+    )
+
+    df['Valor de Venda'] = pd.to_numeric(
+        df['Valor de Venda'],
+        errors='coerce',
+        downcast='float'
+    )
+
+    df['Valor de Compra'] = pd.to_numeric(
+        df['Valor de Compra'],
+        errors='coerce',
+        downcast='float'
+    )
+
+    df.fillna(value={'Valor de Compra': 0}, inplace=True)
+
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+
+    return df
+
+
+def concat_chunks(chunks: list) -> pd.DataFrame:
+    if len(chunks) == 1:
+        return chunks[0]
+
+    df = pd.concat(
+        [chunk.drop(columns=CATEGORY_COLUMNS) for chunk in chunks]
+    )
+
+    # pd.concat falls back to object when category lists differ.
+    for column in CATEGORY_COLUMNS:
+        df[column] = union_categoricals(
+            [chunk[column] for chunk in chunks]
+        )
+
+    return df[SOURCE_COLUMNS]
+
+
+def iter_chunks(path: Path, chunksize: int | None = CSV_CHUNK_SIZE) -> Iterator[pd.DataFrame]:  # noqa: E501
+    reader = pd.read_csv(
+        path,
+        sep=';',
+        usecols=SOURCE_COLUMNS,
+        dtype={column: str for column in SOURCE_COLUMNS},
+        chunksize=chunksize
+    )
+
+    if chunksize is None:
+        yield clean_chunk(reader)
+        return
+
+    with reader:
+        for chunk in reader:
+            yield clean_chunk(chunk)
+
+
+def read_source(path: Path, chunksize: int | None = CSV_CHUNK_SIZE) -> pd.DataFrame:  # noqa: E501
+    chunks = list(iter_chunks(path, chunksize))
+    return sort_by_date(apply_schema(concat_chunks(chunks)))
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    for column in CATEGORY_COLUMNS:
+        values = df[column]
+
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype('category')
+
+        df[column] = values.cat.reorder_categories(
+            np.sort(values.cat.categories.to_numpy().astype(str))
+        )
+
+    for column in PRICE_COLUMNS:
+        df[column] = df[column].astype('float32')
+
+    return df
+
+
+def sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    if df['Data da Coleta'].is_monotonic_increasing:
+        return df
+
+    return df.sort_values('Data da Coleta', kind='stable')
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    untyped = df.copy()
+
+    for column in CATEGORY_COLUMNS:
+        untyped[column] = untyped[column].astype(object)
+
+    for column in PRICE_COLUMNS:
+        untyped[column] = untyped[column].astype('float64')
+
+    report = pd.DataFrame({
+        'object_bytes': untyped.memory_usage(index=False, deep=True),
+        'typed_bytes': df.memory_usage(index=False, deep=True)
+    })
+    report.loc['Total'] = report.sum()
+    report['ratio'] = (report['object_bytes'] / report['typed_bytes']).round(2)
+
+    return report
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def cache_path(path: Path) -> Path:
+    return Path(path).parent / CACHE_DIR_NAME / f'{Path(path).stem}.parquet'
+
+
+def source_key(path: Path, digest: str | None = None) -> dict:
+    stat = os.stat(path)
+
+    return {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': digest if digest is not None else content_hash(path)
+    }
+
+
+def read_cache_key(path: Path) -> dict | None:
+    try:
+        metadata = pq.read_schema(cache_path(path)).metadata or {}
+        return json.loads(metadata[CACHE_METADATA_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        return None
+
+
+def write_cache(path: Path, df: pd.DataFrame, key: dict) -> None:
+    target = cache_path(path)
+    temporary = target.with_suffix('.tmp')
+
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        table = pa.Table.from_pandas(df)
+        metadata = dict(table.schema.metadata or {})
+        metadata[CACHE_METADATA_KEY] = json.dumps(key).encode()
+
+        pq.write_table(table.replace_schema_metadata(metadata),
+                       temporary,
+                       compression='zstd')
+        os.replace(temporary, target)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning("Could not write the cache file '%s': %s", target, e)
+        temporary.unlink(missing_ok=True)
+
+
+def is_cache_valid(path: Path, key: dict | None) -> tuple[bool, str | None]:
+    if key is None or key.get('version') != CACHE_VERSION:
+        return False, None
+
+    stat = os.stat(path)
+
+    if key.get('size') != stat.st_size:
+        return False, None
+
+    if key.get('mtime_ns') == stat.st_mtime_ns:
+        return True, None
+
+    # The file was touched or copied: only its content decides.
+    digest = content_hash(path)
+
+    return key.get('hash') == digest, digest
+
+
+def current_key(path: Path, key: dict | None) -> dict:
+    # The source_key of path, hashing its content only when the given key
+    # is not current.
+    valid, digest = is_cache_valid(path, key)
+
+    if valid and digest is None:
+        return key  # type: ignore
+
+    return source_key(path, digest)
+
+
+def rebuild_cache(path: Path, chunksize: int | None = CSV_CHUNK_SIZE) -> pd.DataFrame:  # noqa: E501
+    digest = content_hash(path)
+    df = read_source(path, chunksize)
+    write_cache(path, df, source_key(path, digest))
+    return df
+
+
+def load_dataframe(path: Path,
+                   rebuild: bool = False,
+                   chunksize: int | None = CSV_CHUNK_SIZE) -> pd.DataFrame:
+    if not rebuild:
+        valid, digest = is_cache_valid(path, read_cache_key(path))
+
+        if valid:
+            try:
+                df = pq.read_table(cache_path(path)).to_pandas()
+            except (OSError, pa.ArrowException) as e:
+                logger.warning("Ignoring unreadable cache file '%s': %s",
+                               cache_path(path), e)
+            else:
+                if digest is not None:
+                    write_cache(path, df, source_key(path, digest))
+
+                return df
+
+    return rebuild_cache(path, chunksize)
+
+
+def source_files(directory: Path, pattern: str = SOURCE_PATTERN) -> list:
+    files = sorted(Path(directory).glob(pattern))
+
+    if len(files) == 0:
+        raise FileNotFoundError(
+            f"No ANP file matching '{pattern}' was found in '{directory}'."
+        )
+
+    return files
+
+
+def load_directory(directory: Path,
+                   rebuild: bool = False,
+                   chunksize: int | None = CSV_CHUNK_SIZE,
+                   max_workers: int | None = None) -> pd.DataFrame:
+    files = source_files(directory)
+    stale = [file for file in files
+             if rebuild or not is_cache_valid(file, read_cache_key(file))[0]]
+    parsed = {}
+
+    # Cached files are cheaper to read here than to ship through a worker.
+    if len(stale) > 1:
+        workers = min(len(stale), max_workers or os.cpu_count() or 1)
+
+        # Spawned workers do not inherit the pyarrow thread pools of the
+        # parent process.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        ) as pool:
+            parsed.update(zip(stale, pool.map(load_dataframe,
+                                              stale,
+                                              repeat(rebuild),
+                                              repeat(chunksize))))
+
+    for file in files:
+        if file not in parsed:
+            parsed[file] = load_dataframe(file, rebuild, chunksize)
+
+    if len(files) == 1:
+        return parsed[files[0]]
+
+    frames = [parsed[file] for file in files]
+
+    df = concat_chunks(frames).reset_index(drop=True)
+
+    return sort_by_date(apply_schema(df))
+
+
+def combine_hashes(hashes: list[str]) -> str:
+    digest = hashlib.blake2b(str(CACHE_VERSION).encode(), digest_size=10)
+
+    for file_hash in hashes:
+        digest.update(file_hash.encode())
+
+    return digest.hexdigest()
+
+
+def source_version(source: Path) -> str:
+    # Changes whenever any source file or the cleaning pipeline changes; the
+    # content hashes are read from the cache files when they are current.
+    files = source_files(source) if Path(source).is_dir() else [Path(source)]
+    keys = [current_key(file, read_cache_key(file)) for file in files]
+
+    return combine_hashes([key['hash'] for key in keys])
+
+
+def load_source(source: Path,
+                rebuild: bool = False,
+                chunksize: int | None = CSV_CHUNK_SIZE,
+                max_workers: int | None = None) -> pd.DataFrame:
+    if Path(source).is_dir():
+        return load_directory(source, rebuild, chunksize, max_workers)
+
+    return load_dataframe(source, rebuild, chunksize)
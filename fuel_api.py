@@ -0,0 +1,228 @@
+import argparse
+import hashlib
+import json
+import logging
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import tornado.ioloop
+import tornado.web
+
+from fuel_backend import FuelBackend
+from fuel_data import FuelData
+from fuel_dataset import STORAGE_BACKENDS, open_dataset
+from result_cache import FILTER_KEYS, filter_spec
+from settings import API_PORT, STORAGE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+OPTION_KEYS = ['regions', 'states', 'cities', 'resales', 'fuels', 'flags']
+
+
+class FuelHandler(tornado.web.RequestHandler):
+
+    # Constructor
+    def initialize(self, dataset: FuelBackend) -> None:
+        self._dataset = dataset
+
+    # private methods
+    def _sets(self) -> dict:
+        # Every filter is a repeated or comma separated query argument, and
+        # the period is given by start and end as ISO dates.
+        sets = {}
+
+        for key in FILTER_KEYS:
+            if key == 'period':
+                continue
+
+            values = [item for value in self.get_query_arguments(key)
+                      for item in value.split(',') if item != '']
+            sets[key] = values or None
+
+        start = self.get_query_argument('start', None)
+        end = self.get_query_argument('end', None)
+
+        if start is None and end is None:
+            sets['period'] = self._dataset.get_default_period()
+        else:
+            min_date, max_date = self._dataset.get_date_bounds()
+            sets['period'] = (
+                datetime.fromisoformat(start) if start else min_date,
+                datetime.fromisoformat(end) if end else max_date
+            )
+
+        return sets
+
+    def _etag(self, sets: dict, *resource: str) -> str:
+        key = repr((self._dataset.get_version(), resource, filter_spec(sets)))
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    async def _respond(self, compute: Callable, *resource: str) -> None:
+        try:
+            sets = self._sets()
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, reason=str(e))
+
+        # Revalidation is answered from the ETag alone, before any filter
+        # runs.
+        self.set_header('Etag', f'"{self._etag(sets, *resource)}"')
+        self.set_header('Cache-Control', 'public, no-cache')
+
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+
+        loop = tornado.ioloop.IOLoop.current()
+
+        try:
+            result = await loop.run_in_executor(None, compute, self._dataset, sets)  # noqa: E501
+        except (TypeError, ValueError) as e:
+            raise tornado.web.HTTPError(400, reason=str(e))
+
+        self.set_header('Content-Type', 'application/json; charset=utf-8')
+        self.write(json.dumps(result, ensure_ascii=False, default=str))
+
+    def compute_etag(self) -> str | None:
+        # The ETag is set before the response is computed.
+        return None
+
+    def write_error(self, status_code: int, **kwargs) -> None:
+        self.set_header('Content-Type', 'application/json; charset=utf-8')
+        self.finish(json.dumps({'error': self._reason}, ensure_ascii=False))
+
+
+class VersionHandler(FuelHandler):
+
+    def get(self) -> None:
+        min_date, max_date = self._dataset.get_date_bounds()
+        start, end = self._dataset.get_default_period()
+
+        self.write({
+            'version': self._dataset.get_version(),
+            'records': self._dataset.get_amount_records(),
+            'date_bounds': [min_date.isoformat(), max_date.isoformat()],
+            'default_period': [start.isoformat(), end.isoformat()]
+        })
+
+
+class MetricsHandler(FuelHandler):
+
+    async def get(self) -> None:
+        await self._respond(metrics, 'metrics')
+
+
+class OptionsHandler(FuelHandler):
+
+    async def get(self, key: str) -> None:
+        if key not in OPTION_KEYS:
+            raise tornado.web.HTTPError(
+                404,
+                reason=f"'{key}' is not an accepted value. option only accepts: "  # noqa: E501
+                       "'regions', 'states', 'cities', 'resales', 'fuels' or 'flags'"  # noqa: E501
+            )
+
+        await self._respond(lambda dataset, sets: {
+            key: options(dataset, key, sets).tolist()
+        }, 'options', key)
+
+
+class ChartHandler(FuelHandler):
+
+    async def get(self, kind: str) -> None:
+        await self._respond(lambda dataset, sets: {
+            'kind': kind,
+            'data': chart_records(filtered(dataset, sets).get_chart_data(kind))  # noqa: E501
+        }, 'charts', kind)
+
+
+def filtered(dataset: FuelBackend, sets: dict) -> FuelData:
+    # Every request filters a view of its own over the shared dataset.
+    view = FuelData(dataset=dataset)
+    view.set_fuel(dict(sets), inplace=True)
+    return view
+
+
+def metrics(dataset: FuelBackend, sets: dict) -> dict:
+    view = filtered(dataset, sets)
+
+    values = view.get_metric_values()
+
+    # Raw numbers for the clients, and the card strings of the dashboard
+    # apart. Prices are stored as float32, so three decimals drop the noise
+    # of widening them.
+    return {
+        'records': view.get_amount_records(),
+        'products': {
+            produto: {measure: round(value, 3) for measure, value in measures.items()}  # noqa: E501
+            for produto, measures in values['products'].items()
+        },
+        'cost_benefit': values['cost_benefit'],
+        'formatted': asdict(view.get_metrics())
+    }
+
+
+def options(dataset: FuelBackend, key: str, sets: dict) -> np.ndarray:
+    # Same lists as the dashboard widgets, which are answered over the
+    # whole dataset before the filters are applied.
+    view = FuelData(dataset=dataset)
+    sets = dict(sets)
+
+    match key:
+        case 'regions':
+            return view.get_regions()
+        case 'states':
+            return view.get_states(sets['regions'] or [])
+        case 'cities':
+            return view.get_cities(sets['states'] or [])
+        case 'resales':
+            return view.get_resales(sets, option_all=False)
+        case 'fuels':
+            return view.get_fuels(sets)
+        case _:
+            return view.get_flags(sets)
+
+
+def chart_records(data: pd.DataFrame) -> list[dict]:
+    # Same three decimals as the metrics, over the float32 averages.
+    floats = data.select_dtypes('floating').columns
+    data = data.astype({column: 'float64' for column in floats}).round(3)
+
+    return json.loads(data.to_json(orient='records',
+                                   date_format='iso',
+                                   force_ascii=False))
+
+
+def make_app(dataset: FuelBackend) -> tornado.web.Application:
+    arguments = {'dataset': dataset}
+
+    return tornado.web.Application([
+        (r'/api/version', VersionHandler, arguments),
+        (r'/api/metrics', MetricsHandler, arguments),
+        (r'/api/options/([a-z]+)', OptionsHandler, arguments),
+        (r'/api/charts/([a-z_]+)', ChartHandler, arguments),
+    ])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Serve the metrics, option lists and chart aggregates'
+                    ' of FuelData as JSON.')
+    parser.add_argument('--source', type=Path, default=None,
+                        help='ANP CSV file or folder; the base folder by default')  # noqa: E501
+    parser.add_argument('--backend', choices=list(STORAGE_BACKENDS),
+                        default=STORAGE_BACKEND)
+    parser.add_argument('--address', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=API_PORT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    app = make_app(open_dataset(args.source, args.backend))
+    app.listen(args.port, args.address)
+    logger.info('Serving on http://%s:%d/api', args.address, args.port)
+
+    tornado.ioloop.IOLoop.current().start()
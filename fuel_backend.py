@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fuel_labels import FuelLabels
+from result_cache import ResultCache
+from settings import (DEFAULT_PERIOD_DAYS, RENDER_CACHE_MAX_BYTES,
+                      RESULT_CACHE_MAX_BYTES)
+
+
+# Storage of the survey shared by every FuelData. Rows are addressed by their
+# position in collection date order; the storage backends answer the filter,
+# option and aggregate queries over them, taking the normalized set_fuel
+# dictionaries.
+class FuelBackend(ABC):
+
+    # Constructor
+    def __init__(self,
+                 min_date: datetime,
+                 max_date: datetime,
+                 labels: FuelLabels,
+                 version: str,
+                 cache_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 render_bytes: int = RENDER_CACHE_MAX_BYTES) -> None:
+        self.__min_date = min_date
+        self.__max_date = max_date
+        self.__date_start = max(
+            min_date,
+            max_date - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+        )
+
+        self.__labels = labels
+        self.__version = version
+        self.__cache = ResultCache(cache_bytes)
+        self.__renders = ResultCache(render_bytes)
+
+    # Getters
+    def get_labels(self) -> FuelLabels:
+        return self.__labels
+
+    def get_cache(self) -> ResultCache:
+        return self.__cache
+
+    def get_render_cache(self) -> ResultCache:
+        return self.__renders
+
+    def get_version(self) -> str:
+        return self.__version
+
+    def get_date_bounds(self) -> tuple[datetime, datetime]:
+        return self.__min_date, self.__max_date
+
+    def get_default_period(self) -> tuple[datetime, datetime]:
+        return self.__date_start, self.__max_date
+
+    def covers_dataset(self, period: tuple | None) -> bool:
+        if period is None:
+            return True
+
+        return (pd.Timestamp(period[0]) <= self.__min_date
+                and pd.Timestamp(period[1]) >= self.__max_date)
+
+    @abstractmethod
+    def get_amount_records(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_columns(self) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_rows(self, sets: dict) -> np.ndarray:
+        raise NotImplementedError
+
+    @abstractmethod
+    def take(self,
+             rows: np.ndarray | None,
+             columns: list | None = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_cells(self, sets: dict) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_options(self, key: str, sets: dict) -> np.ndarray:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_values(self, key: str, rows: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_memory_usage(self) -> list[tuple[str, int, int]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_memory_report(self) -> pd.DataFrame:
+        raise NotImplementedError
@@ -1,15 +1,25 @@
+import math
+import os
+import tempfile
+import uuid
 from datetime import datetime
+from typing import Any, Callable
 
+import pandas as pd
 import streamlit as st
 from typing_extensions import Literal, TypeAlias
 
-from fuel_data import FuelData
-from settings import DATE_END, DATE_START, MAX_DATE, MIN_DATE
-from tools import word_capitalize
+from fuel_data import ChartKind, FuelData
+from fuel_dataset import FuelDataset
+from memory_accounting import account, column_report
+from profiling import profile_methods, write_records
+from settings import (CHART_BACKEND, CHART_DPI, PAGE_SIZE, PREVIEW_DPI,
+                      PROGRESSIVE_CHARTS)
 
 OptValue: TypeAlias = Literal['Inicial', 'Final']
 
 
+@profile_methods(lambda self: self._fdt.get_amount_records())
 class FuelController():
 
     _state = st.session_state
@@ -44,11 +54,14 @@ class FuelController():
             ]
         }
 
+        date_start, date_end = self._fdt.get_default_period()
+        min_date, max_date = self._fdt.get_date_bounds()
+
         value = st.date_input(
             f':calendar: {params[option][0]}',
-            DATE_START if option == 'Inicial' else DATE_END,
-            MIN_DATE,
-            MAX_DATE,
+            date_start if option == 'Inicial' else date_end,
+            min_date,
+            max_date,
             key=params[option][1],
             help=params[option][2]
         )
@@ -124,7 +137,7 @@ class FuelController():
             ':city_sunrise: Município(s)',
             cities_list,
             max_selections=4,
-            format_func=lambda x: word_capitalize(x),
+            format_func=self._fdt.get_labels().get_formatter('Municipio'),
             key='selected_city',
             help='Selecione um ou mais municípios brasileiros'
         )
@@ -135,7 +148,7 @@ class FuelController():
         return str(st.selectbox(
             ':city_sunrise: Município',
             cities_list,
-            format_func=lambda x: word_capitalize(x),
+            format_func=self._fdt.get_labels().get_formatter('Municipio'),
             key='selected_city',
             help='Selecione um município brasileiro'
         ))
@@ -146,7 +159,7 @@ class FuelController():
         return [st.selectbox(
             ':shopping_trolley: Revenda',
             resales_list,
-            format_func=lambda x: word_capitalize(x),
+            format_func=self._fdt.get_labels().get_formatter('Revenda'),
             key='selected_resale',
             help='Selecione um revendedor'
         )]
@@ -158,7 +171,7 @@ class FuelController():
             ':fuelpump: Combustível',
             fuels_list,
             max_selections=len(fuels_list)-1,
-            format_func=lambda x: word_capitalize(x),
+            format_func=self._fdt.get_labels().get_formatter('Produto'),
             key='selected_fuels',
             help='Selecione um ou mais tipos de combustível'
         )
@@ -170,7 +183,202 @@ class FuelController():
             ':waving_white_flag: Bandeira',
             flags_list,
             max_selections=len(flags_list)-1,
-            format_func=lambda x: word_capitalize(x),
+            format_func=self._fdt.get_labels().get_formatter('Bandeira'),
             key='selected_flags',
             help='Selecione uma ou mais bandeiras'
         )
+
+    def section_active(self, key: str, label: str = 'Exibir gráfico') -> bool:  # noqa: E501
+        return st.checkbox(
+            f':eye: {label}',
+            key=f'show_{key}',
+            help='A seção só é calculada quando exibida'
+        )
+
+    def deferred(self, key: str, job: Callable, *args) -> Any:
+        # The result of a section is kept in the shared render cache until
+        # the filters (or the job arguments) change, so reruns only redraw
+        # it; the session holds no copy the cache could not evict or account.
+        cache = self._fdt.get_dataset().get_render_cache()
+        stamp = (self._fdt.get_spec(), 'deferred', key) + tuple(
+            tuple(arg) if isinstance(arg, list) else arg for arg in args)
+
+        return cache.get_or_compute(stamp, lambda: job(*args))
+
+    def chart_images(self, kind: ChartKind) -> None:
+        dpi = CHART_DPI
+
+        # A light preview is sent first; the full resolution image is only
+        # rendered and sent when asked for.
+        if PROGRESSIVE_CHARTS:
+            high_dpi = st.checkbox(
+                ':mag: Alta resolução',
+                key=f'high_dpi_{kind}',
+                help='Carrega o gráfico em alta resolução'
+            )
+            dpi = CHART_DPI if high_dpi else PREVIEW_DPI
+
+        # The encoded images are already kept in the render cache.
+        for image in self._fdt.get_chart_images(kind, dpi):
+            st.image(image, use_column_width=True)
+
+    def chart_specs(self, kind: ChartKind) -> None:
+        # The specs are only built over the aggregates of the result cache.
+        for spec in self._fdt.get_chart_specs(kind):
+            st.altair_chart(spec, use_container_width=kind == 'evolution')
+
+    def chart(self, kind: ChartKind) -> None:
+        if CHART_BACKEND not in ['matplotlib', 'altair']:
+            raise ValueError(
+                f"'{str(CHART_BACKEND)}' is not an accepted value. CHART_BACKEND only accepts: "  # noqa: E501
+                "'matplotlib' or 'altair'"
+            )
+
+        if not self.section_active(kind):
+            return
+
+        if CHART_BACKEND == 'altair':
+            self.chart_specs(kind)
+        else:
+            self.chart_images(kind)
+
+    def paginated_table(self, columns: list) -> None:
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            sort_by = st.selectbox(
+                ':arrow_up_down: Ordenar por',
+                ['Data da Coleta'] + [c for c in columns if c != 'Data da Coleta'],  # noqa: E501
+                key='page_sort_by',
+                help='Selecione a coluna de ordenação'
+            )
+
+        with col2:
+            order = st.selectbox(
+                ':arrow_heading_down: Ordem',
+                ['Crescente', 'Decrescente'],
+                key='page_order',
+                help='Selecione a ordem de exibição'
+            )
+
+        with col3:
+            page_size = int(st.selectbox(
+                ':page_facing_up: Registros por página',
+                [PAGE_SIZE, PAGE_SIZE * 2, PAGE_SIZE * 4],
+                key='page_size',
+                help='Selecione a quantidade de registros por página'
+            ))
+
+        total = self._fdt.get_amount_records()
+        pages = max(1, math.ceil(total / page_size))
+
+        # The widget takes its value from the session alone, which is seeded
+        # once; narrower filters may leave fewer pages than the one last
+        # shown.
+        if self._state.setdefault('page_number', 1) > pages:
+            self._state['page_number'] = pages
+
+        with col4:
+            page = int(st.number_input(
+                f':1234: Página (de {pages})',
+                min_value=1,
+                max_value=pages,
+                step=1,
+                key='page_number',
+                help='Selecione a página a exibir'
+            ))
+
+        data, _ = self.deferred(
+            'spreadsheet',
+            self._fdt.get_page,
+            columns,
+            page,
+            page_size,
+            sort_by,
+            order == 'Crescente'
+        )
+
+        st.dataframe(self._fdt.get_page_style(data), use_container_width=True)
+
+    def export_button(self, columns: list) -> None:
+        formats = {
+            'CSV (vírgula decimal)': ('csv', ',', 'text/csv'),
+            'CSV (ponto decimal)': ('csv', '.', 'text/csv'),
+            'Parquet': ('parquet', ',', 'application/octet-stream')
+        }
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            option = st.selectbox(
+                ':floppy_disk: Formato de exportação',
+                list(formats),
+                key='export_format',
+                help='Selecione o formato do arquivo exportado'
+            )
+
+        format, decimal, mimetype = formats[str(option)]
+
+        with col2:
+            prepare = st.button(':package: Preparar arquivo',
+                                use_container_width=True)
+
+        if not prepare:
+            return
+
+        # The chunks go straight to a temporary file, so the filtered rows
+        # are never copied or formatted as a whole; st.download_button still
+        # reads the whole file into memory to send it.
+        target = tempfile.NamedTemporaryFile(suffix=f'.{format}',
+                                             delete=False)
+
+        try:
+            with target:
+                self._fdt.export(target, format, columns, decimal)
+
+            with open(target.name, 'rb') as data:
+                st.download_button(
+                    ':arrow_down: Baixar arquivo',
+                    data,
+                    file_name=f'fuel-analysis.{format}',
+                    mime=mimetype,
+                    use_container_width=True
+                )
+        finally:
+            os.remove(target.name)
+
+    def profiling_panel(self, records: list) -> None:
+        session = self._state.setdefault('profile_session', uuid.uuid4().hex)
+        write_records(records, session)
+
+        data = pd.DataFrame(records, columns=['operation', 'depth', 'ms', 'rows_in', 'rows_out'])  # noqa: E501
+        data['operation'] = [
+            ' ' * depth + operation
+            for operation, depth in zip(data['operation'], data['depth'])
+        ]
+        total = data.loc[data['depth'] == 0, 'ms'].sum()
+
+        with st.sidebar:
+            with st.expander(f':stopwatch: **Tempo de execução: {total:,.0f} ms**'):  # noqa: E501
+                st.dataframe(
+                    data.drop(columns=['depth']).style.format(
+                        {'ms': '{:,.1f}', 'rows_in': '{:,.0f}', 'rows_out': '{:,.0f}'},  # noqa: E501
+                        na_rep='—'
+                    ),
+                    use_container_width=True
+                )
+
+    def memory_panel(self) -> None:
+        dataset = self._fdt.get_dataset()
+        report = account(dataset)
+        total = report.loc['Total', 'bytes'] / 1024 ** 2
+
+        with st.sidebar:
+            with st.expander(f':floppy_disk: **Memória: {total:,.1f} MiB**'):
+                st.dataframe(report.style.format(
+                    {'items': '{:,.0f}', 'bytes': '{:,.0f}'}, na_rep='—'),
+                    use_container_width=True)
+
+                if isinstance(dataset, FuelDataset):
+                    st.dataframe(column_report(dataset.get_frame()),
+                                 use_container_width=True)
@@ -0,0 +1,82 @@
+import pandas as pd
+
+from fuel_index import FuelIndex
+
+# Dimensions kept by the cube, from the coarsest to the finest.
+CUBE_DIMENSIONS = [
+    'Data da Coleta',
+    'Regiao - Sigla',
+    'Estado - Sigla',
+    'Municipio',
+    'Bandeira',
+    'Produto'
+]
+
+MEASURES = ['sum', 'count', 'min', 'max']
+
+# Time buckets of the evolution chart, from the finest to the coarsest: the
+# longest span (in days) each one is chosen for and the format of its dates.
+# ANP surveys run weekly from Sunday to Saturday ('W-SAT' buckets are named
+# by their Saturday).
+TIME_BUCKETS = {
+    'D': (92, '%d/%m/%Y'),
+    'W-SAT': (731, '%d/%m/%Y'),
+    'MS': (None, '%m/%Y')
+}
+
+
+def aggregate(df: pd.DataFrame) -> pd.DataFrame:
+    values = df['Valor de Venda'].astype('float64')
+    cube = values.groupby([df[column] for column in CUBE_DIMENSIONS],
+                          observed=True,
+                          dropna=False).agg(MEASURES)
+    return cube.reset_index()
+
+
+def roll_up(cube: pd.DataFrame, by: list, sort: bool = True) -> pd.DataFrame:
+    result = cube.groupby(by, observed=True, dropna=False, sort=sort).agg(
+        sum=('sum', 'sum'),
+        count=('count', 'sum'),
+        min=('min', 'min'),
+        max=('max', 'max')
+    )
+    result['mean'] = result['sum'] / result['count']
+    return result
+
+
+def time_bucket(start: pd.Timestamp, end: pd.Timestamp) -> str:
+    span = (end - start).days if pd.notna(start) and pd.notna(end) else 0
+
+    for freq, (max_days, _) in TIME_BUCKETS.items():
+        if max_days is None or span <= max_days:
+            return freq
+
+    return 'MS'
+
+
+def bucket_by_time(cube: pd.DataFrame, freq: str) -> pd.DataFrame:
+    grouper = pd.Grouper(key='Data da Coleta', freq=freq)
+    return roll_up(cube, [grouper, 'Produto'])
+
+
+class FuelCube():
+
+    # Constructor
+    def __init__(self, df: pd.DataFrame) -> None:
+        # Grouping by the date first keeps the cube sorted by date, as the
+        # index expects.
+        self.__df = aggregate(df)
+        self.__index = FuelIndex(self.__df)
+
+    # Getters
+    def get_frame(self) -> pd.DataFrame:
+        return self.__df
+
+    def get_cells(self, sets: dict) -> pd.DataFrame:
+        if sets.get('resales') is not None:
+            raise ValueError(
+                "'resales' is not an accepted filter. The cube only keeps: "
+                "'period', 'regions', 'states', 'cities', 'fuels' and 'flags'"
+            )
+
+        return self.__df.take(self.__index.get_rows(sets))
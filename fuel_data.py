@@ -1,84 +1,196 @@
+import os
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
-from typing import Any, Callable, Union
+from typing import Any, BinaryIO, Callable, Iterator, Union
 
+import altair as alt
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import seaborn as sns
 from numpy import arange, isnan
+from pandas.io.formats.style import Styler
 from typing_extensions import Literal, TypeAlias
 
+from altair_charts import bar_chart, line_chart
+from charts import plot_bar, render_bars
 from custom_exceptions import ExcessValues
-from settings import DATE_END, DATE_START
-from tools import word_capitalize
-
-BASE_DIR = Path(__file__).resolve().parent
+from data_export import csv_chunks, parquet_chunks
+from data_loader import PRODUCTS
+from fuel_backend import FuelBackend
+from fuel_cube import (TIME_BUCKETS, aggregate, bucket_by_time, roll_up,
+                       time_bucket)
+from fuel_dataset import FuelDataset
+from fuel_labels import FuelLabels
+from fuel_metrics import (COST_BENEFIT_FUELS, OPERATIONS, FuelMetrics,
+                          ProductMetrics)
+from memory_accounting import frame_bytes, track_view
+from profiling import profile_methods, timer
+from result_cache import filter_spec
+from settings import (CHART_DPI, CSV_CHUNK_SIZE, EXPORT_CHUNK_ROWS, PAGE_SIZE,
+                      RENDER_WORKERS)
+from tools import currency_format
 
 Value: TypeAlias = Union['pd.Series', float, None]
-DataValue: TypeAlias = Union['pd.DataFrame', 'pd.Series']
 ArrayType: TypeAlias = Union[pd.Series, np.ndarray]
-StringValue: TypeAlias = Union[str, None]
 Operation: TypeAlias = Literal['Mínimo', 'Máximo', 'Médio']
 Fuel: TypeAlias = Literal['GASOLINA', 'GASOLINA ADITIVADA']
+FilterEngine: TypeAlias = Literal['index', 'query']
+ExportFormat: TypeAlias = Literal['csv', 'parquet']
+ChartKind: TypeAlias = Literal['region', 'regions_and_states', 'cities', 'flags', 'evolution']  # noqa: E501
 
 
-class FuelData():
+REGION_NAMES = {
+    'CO': 'Centro-Oeste',
+    'N': 'Norte',
+    'NE': 'Nordeste',
+    'S': 'Sul',
+    'SE': 'Sudeste'
+}
 
-    __df = pd.DataFrame
+
+@profile_methods(lambda self: self.get_amount_records())
+class FuelData():
 
     # Constructor
-    def __init__(self) -> None:
-        df = pd.read_csv(Path.joinpath(
-            BASE_DIR, 'base/ca-2022-02.csv'), sep=';')
-
-        df['Data da Coleta'] = pd.to_datetime(
-            df['Data da Coleta'],
-            exact=True,
-            dayfirst=True,
-            infer_datetime_format=True,
-            format='%d/%m/%Y',
-            errors='coerce'
-        )
+    def __init__(self,
+                 source: Path | None = None,
+                 rebuild_cache: bool = False,
+                 chunksize: int | None = CSV_CHUNK_SIZE,
+                 max_workers: int | None = None,
+                 dataset: FuelBackend | None = None) -> None:
+        if dataset is None:
+            dataset = FuelDataset(source,
+                                  rebuild_cache,
+                                  chunksize,
+                                  max_workers)
+
+        # The dataset is shared between sessions and never modified: the
+        # filters only narrow the row positions seen by this instance.
+        self.__dataset = dataset
+        self.__rows = None
+        self.__view = None
+
+        # Steps that narrowed this view, used to key the shared result cache,
+        # and the filters describing it while the price cube can answer for
+        # it (None once a step the cube does not know about was applied).
+        self.__spec = ()
+        self.__sets = {}
+
+        track_view(self)
+
+    @property
+    def __df(self) -> pd.DataFrame:
+        if self.__rows is None:
+            return self.__dataset.take(None)
+
+        if self.__view is None:
+            self.__view = self.__dataset.take(self.__rows)
+
+        return self.__view
 
-        df['Valor de Venda'] = df['Valor de Venda'].str.replace(
-            ',',
-            '.',
-            regex=False
-        )
+    # private methods
+    def __restrict(self,
+                   rows: np.ndarray,
+                   step: tuple,
+                   sets: dict | None = None) -> None:
+        self.__rows = rows
+        self.__view = None
+        self.__sets = sets if len(self.__spec) == 0 else None
+        self.__spec = self.__spec + (step,)
 
-        df['Valor de Venda'] = pd.to_numeric(
-            df['Valor de Venda'],
-            errors='coerce',
-            downcast='float'
-        )
+    def __narrow(self, mask: pd.Series, step: tuple) -> None:
+        positions = np.flatnonzero(mask.to_numpy(dtype=bool))
+        rows = positions if self.__rows is None else self.__rows[positions]
+        self.__restrict(rows, step)
 
-        df['Valor de Compra'] = pd.to_numeric(
-            df['Valor de Compra'],
-            errors='coerce',
-            downcast='float'
-        )
+    def __cached(self, compute: Callable, *key) -> Any:
+        cache = self.__dataset.get_cache()
+        return cache.get_or_compute((self.__spec,) + key, compute)
+
+    def __select(self, sets: dict) -> np.ndarray:
+        def compute() -> np.ndarray:
+            rows = self.__dataset.get_rows(sets)
 
-        df.fillna(value={'Valor de Compra': 0}, inplace=True)
-
-        df.drop(
-            [
-                'Nome da Rua',
-                'Numero Rua',
-                'Complemento',
-                'Bairro',
-                'Cep',
-                'Unidade de Medida'
-            ],
-            axis=1,
-            inplace=True
+            if self.__rows is not None:
+                rows = np.intersect1d(self.__rows, rows, assume_unique=True)
+
+            return rows
+
+        return self.__cached(compute, 'rows', filter_spec(sets))
+
+    def __cube(self) -> pd.DataFrame:
+        def compute() -> pd.DataFrame:
+            if self.__sets is not None:
+                return self.__dataset.get_cells(self.__sets)
+
+            return aggregate(self.__df)
+
+        return self.__cached(compute, 'cube')
+
+    def __sale_value(self, summary: pd.DataFrame, measure: str, produto: str) -> float:  # noqa: E501
+        result = summary[measure].get(produto, np.nan)
+        return float(result) if not isnan(result) else float(0)
+
+    def __cost_benefit(self, summary: pd.DataFrame, other_fuel: str, operation: str) -> float:  # noqa: E501
+        values = summary[OPERATIONS[operation]]
+        ethanol = values.get('ETANOL', np.nan)
+        other = values.get(other_fuel, np.nan)
+
+        cost_benefit = round(ethanol / other * 100, 1)
+        return float(cost_benefit) if not isnan(cost_benefit) else float(0)
+
+    def __average_sales(self, by: list) -> pd.Series:
+        return self.__cached(
+            lambda: roll_up(self.__cube(), by)['mean'].round(3),
+            'average_sales', tuple(by)
         )
 
-        self.__df = df[df['Produto'].isin(
-            ['GASOLINA', 'GASOLINA ADITIVADA', 'ETANOL']
-        )]
+    def __average_sales_by(self, *columns: str) -> pd.DataFrame:
+        by = list(columns) + ['Produto']
+        data = self.__average_sales(by).rename('Valor de Venda').reset_index()
+
+        for name in by:
+            data[name] = data[name].cat.remove_unused_categories()
+
+            if name not in ['Regiao - Sigla', 'Estado - Sigla']:
+                data[name] = self.get_labels().relabel(data[name])
+
+        return data
+
+    def __evolution_sales(self) -> pd.DataFrame:
+        def compute() -> pd.DataFrame:
+            # Daily sums and counts are resampled into the bucket of the
+            # span, so the chart gets one mean per product and bucket.
+            data = bucket_by_time(self.__cube(), self.get_time_bucket())
+            data = data['mean'].rename('Valor de Venda').reset_index()
+            data['Produto'] = data['Produto'].cat.remove_unused_categories()
+            data['Produto'] = self.get_labels().relabel(data['Produto'])
+
+            return data.dropna(subset=['Valor de Venda'])
+
+        return self.__cached(compute, 'evolution_sales')
+
+    def __check_amount(self,
+                       data: pd.DataFrame,
+                       column: str,
+                       name: str,
+                       maximum: int) -> pd.DataFrame:
+        amount = data[column].unique().shape[0]
+
+        if amount > maximum:
+            raise ExcessValues(
+                f'This search generated many results, about {amount}'
+                f' {name} were selected, so it is not possible to display the'
+                f' information clearly. A maximum of {maximum} {name} must be'
+                ' selected for information to be displayed.'
+            )
+
+        return data
 
-    # private methods
     def __include_all_option(self, array: ArrayType) -> ArrayType:
 
         if isinstance(array, pd.Series):
@@ -94,199 +206,156 @@ class FuelData():
                 " Please convert the value to an accepted type."
             )
 
-    def __currency_format(self, value: Value) -> Any:
-        if value is None:
-            value = "—"
-        elif isinstance(value, pd.Series):
-            value = value.map('R$ {:,.2f}'.format)
-            value = pd.Series(value, dtype='string')
-            value = value.str.replace('.', ',', regex=False)
-        elif isinstance(value, float):
-            value = f'R$ {value:,.2f}'.replace('.', ',')
-        else:
-            raise TypeError(
-                f"'{str(value)}' is of type {str(type(value))}, which is not an accepted type."  # noqa: E501
-                " value only accepts: pandas.Series, float or None"
-                " Please convert the value to an accepted type."
-            )
+    def __options(self, key: str, sets: dict) -> np.ndarray:
+        return self.__cached(lambda: self.__find_options(key, sets),
+                             'options', key, filter_spec(sets))
 
-        return value
+    def __find_options(self, key: str, sets: dict) -> np.ndarray:
+        # The storage answers for the whole dataset; a narrowed view looks
+        # the values up on its own rows.
+        if self.__rows is None:
+            return self.__dataset.get_options(key, sets)
+
+        return self.__dataset.get_values(key, self.__select(sets))
+
+    def __currency_format(self, value: Value) -> Any:
+        return currency_format(value)
 
     def __br_date_format(self, column: pd.Series) -> pd.Series:
         return column.dt.strftime('%d/%m/%Y')
 
-    def __plot_bar(self,
-                   df: DataValue,
-                   suptitle: StringValue = None,
-                   display_bar_label: bool = False,
-                   chart_break: bool = False) -> plt.Figure:
+    def __sort_order(self, sort_by: str | None, ascending: bool) -> np.ndarray:  # noqa: E501
+        def compute() -> np.ndarray:
+            amount = self.get_amount_records()
 
-        if isinstance(df, pd.Series):
-            df = pd.DataFrame(df)
-        else:
-            if not isinstance(df, pd.DataFrame):
-                raise TypeError(
-                    f"'{str(df)}' is of type {str(type(df))}, which is not an accepted type."  # noqa: E501
-                    " value only accepts: pandas.DataFrame or pandas.Series"
-                    " Please convert the value to an accepted type."
-                )
+            # Rows are already in collection date order.
+            if sort_by is None or (sort_by == 'Data da Coleta' and ascending):
+                return np.arange(amount)
 
-        if not isinstance(display_bar_label, bool):
-            raise TypeError(
-                f"'{str(display_bar_label)}' is of type {str(type(display_bar_label))}, which is not an accepted type."  # noqa: E501
-                " value only accepts: bool"
-                " Please convert the value to an accepted type."
-            )
+            # Only the sort column is read, unless the view was copied.
+            view = self.__view
 
-        if not isinstance(chart_break, bool):
-            raise TypeError(
-                f"'{str(chart_break)}' is of type {str(type(chart_break))}, which is not an accepted type."  # noqa: E501
-                " value only accepts: bool"
-                " Please convert the value to an accepted type."
-            )
+            if view is None:
+                view = self.__dataset.take(self.__rows, [sort_by])
 
-        if not isinstance(suptitle, str) and suptitle is not None:
-            raise TypeError(
-                f"'{str(suptitle)}' is of type {str(type(suptitle))}, which is not an accepted type."  # noqa: E501
-                " value only accepts: str or None"
-                " Please convert the value to an accepted type."
-            )
+            column = view[sort_by]
 
-        plt.style.use('Solarize_Light2')
+            # Categories are kept sorted, so their codes sort like the
+            # values; missing values become NaN and go last both ways.
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                keys = column.cat.codes.to_numpy().astype(np.float64)
+            elif column.dtype.kind == 'M':
+                keys = column.to_numpy().view(np.int64).astype(np.float64)
+            else:
+                keys = column.to_numpy(dtype=np.float64)
 
-        bar_width = 0.25
-        fs_bar_label = 9
-        fs_legend = 10
-        fs_label = 10
-        fs_ticks = 10
+            keys[column.isna().to_numpy()] = np.nan
 
-        bar_colors = {
-            'ETANOL': 'green',
-            'GASOLINA': 'orange',
-            'GASOLINA ADITIVADA': 'tomato',
-        }
+            # A stable sort keeps ties in collection date order both ways.
+            return np.argsort(keys if ascending else -keys, kind='stable')
+
+        return self.__cached(compute, 'sort_order', sort_by, ascending)
+
+    def __product_labels(self) -> dict:
+        labels = self.get_labels()
+        return {value: labels.get_label('Produto', value)
+                for value in PRODUCTS}
+
+    def __region_sheets(self) -> list[tuple[pd.DataFrame, str]]:
+        columns = ['Regiao - Sigla', 'Estado - Sigla', 'Produto']
+        average_states = self.__average_sales(columns).unstack(level=2)
+        regions = average_states.index.get_level_values(level=0).unique()
+        sheets = []
+
+        for region in regions:
+            sheet = average_states.loc[region]
+            sheet.columns.name = None
+            sheet.index.name = None
+            sheets.append((sheet, f'Região: {REGION_NAMES[region]}'))
 
-        if df.shape[0] > 4 and chart_break:
-            fig, (ax, ax1) = plt.subplots(
-                2,
-                1,
-                figsize=(11.3, 12),
-                layout='tight',
-                dpi=600
+        return sheets
+
+    def __check_kind(self, kind: ChartKind) -> None:
+        if kind not in ['region', 'regions_and_states', 'cities', 'flags', 'evolution']:  # noqa: E501
+            raise ValueError(
+                f"'{str(kind)}' is not an accepted value. kind only accepts: "
+                "'region', 'regions_and_states', 'cities', 'flags' or 'evolution'"  # noqa: E501
             )
+
+    def __figures(self, kind: ChartKind) -> list[plt.Figure]:
+        figures = []
+
+        match kind:
+            case 'region':
+                self.get_chart_sales_value_by_region(figures.append)
+            case 'regions_and_states':
+                self.get_chart_sales_value_by_regions_and_states(figures.append)  # noqa: E501
+            case 'cities':
+                figures.append(self.get_chart_sales_value_by_cities())
+            case 'flags':
+                figures.append(self.get_chart_sales_value_by_flags())
+            case 'evolution':
+                figures.append(
+                    self.get_chart_evolution_of_sales_values_over_time())
+
+        return figures
+
+    def __normalize_sets(self, sets: dict | None) -> dict:
+        _default = {
+            'cities': None,
+            'flags': None,
+            'fuels': None,
+            'period': self.get_default_period(),
+            'regions': None,
+            'resales': None,
+            'states': None
+        }
+
+        if sets is None:
+            sets = _default
+
+        if isinstance(sets, dict):
+            keys_sets = list(sets.keys())
+            keys_sets.sort()
+
+            keys_default = list(_default.keys())
+            keys_default.sort()
+
+            if keys_sets != keys_default:
+                raise ValueError(
+                    "All keys must be declared."
+                    " The dictionary must contain all of the following keys: 'period', 'regions', 'states', 'cities', 'resales', 'fuels', 'flags'."  # noqa: E501
+                    " Even if you don't need to use a certain key, you must declare it with a value of type None."  # noqa: E501
+                )
         else:
-            fig, ax = plt.subplots(
-                1,
-                1,
-                figsize=(11.3, 6),
-                layout='tight',
-                dpi=600
+            raise TypeError(
+                f"'{str(sets)}' is of type '{str(type(sets))}', which is not an accepted type."  # noqa: E501
+                " value only accepts: dict only"
+                " Please convert the value to an accepted type."
             )
 
-        x = [p - bar_width for p in arange(len(df.index))]
-
-        for column in df.columns:
-            h = df[column]
-            x = [p + bar_width for p in x]
-
-            if df.shape[0] > 4 and chart_break:
-                bar_container = ax.bar(x[:4],
-                                       h[:4],
-                                       color=bar_colors[column],
-                                       width=bar_width,
-                                       edgecolor='white',
-                                       linewidth=0.8,
-                                       label=word_capitalize(column))
-
-                bar_container1 = ax1.bar(x[4:],
-                                         h[4:],
-                                         color=bar_colors[column],
-                                         width=bar_width,
-                                         edgecolor='white',
-                                         linewidth=0.8,
-                                         label=word_capitalize(column))
-
-                if display_bar_label:
-                    ax.bar_label(bar_container,
-                                 fmt=self.__currency_format,
-                                 padding=1,
-                                 rotation=30,
-                                 fontweight='light',
-                                 fontsize=fs_bar_label)
-
-                    ax1.bar_label(bar_container1,
-                                  fmt=self.__currency_format,
-                                  padding=1,
-                                  rotation=30,
-                                  fontweight='light',
-                                  fontsize=fs_bar_label)
-            else:
-                bar_container = ax.bar(x,
-                                       h,
-                                       color=bar_colors[column],
-                                       width=bar_width,
-                                       edgecolor='white',
-                                       linewidth=0.8,
-                                       label=word_capitalize(column))
-                if display_bar_label:
-                    ax.bar_label(bar_container,
-                                 fmt=self.__currency_format,
-                                 padding=1,
-                                 rotation=30,
-                                 fontweight='light',
-                                 fontsize=fs_bar_label)
-
-        ax.set_xlabel('Estado(s)', fontweight='book', fontsize=fs_label)
-
-        if df.shape[0] > 4 and chart_break:
-            ax1.set_xlabel('Estado(s)', fontweight='book', fontsize=fs_label)
-
-        ax.set_ylabel('Valor Médio de Venda',
-                      fontweight='book', fontsize=fs_label)
-
-        if len(df.columns) > 2:
-            x = [p - bar_width for p in x]
-        elif len(df.columns) % 2 == 0:
-            x = [p - (bar_width / 2) for p in x]
-
-        if df.shape[0] > 4 and chart_break:
-            ax.set_xticks(x[:4],
-                          df.index[:4],
-                          fontsize=fs_ticks,
-                          fontweight='regular')
-
-            ax1.set_xticks(x[4:],
-                           df.index[4:],
-                           fontsize=fs_ticks,
-                           fontweight='regular')
-
-            ax.set_yticks([v for v in arange(0, 8, 0.5)],
-                          [str(v) for v in arange(0, 8, 0.5)],
-                          fontsize=fs_ticks,
-                          fontweight='regular')
-
-            ax1.set_yticks([v for v in arange(0, 8, 0.5)],
-                           [str(v) for v in arange(0, 8, 0.5)],
-                           fontsize=fs_ticks,
-                           fontweight='regular')
-        else:
-            ax.set_xticks(x,
-                          df.index,
-                          fontsize=fs_ticks,
-                          fontweight='regular')
+        if sets.get('cities') == ['Todos'] or sets.get('cities') == []:
+            sets.update({'cities': None})
 
-            ax.set_yticks([v for v in arange(0, 8, 0.5)],
-                          [str(v) for v in arange(0, 8, 0.5)],
-                          fontsize=fs_ticks,
-                          fontweight='regular')
+        if sets.get('flags') == ['Todos'] or sets.get('flags') == []:
+            sets.update({'flags': None})
 
-        if suptitle is not None:
-            fig.suptitle(suptitle)
+        if sets.get('fuels') == ['Todos'] or sets.get('fuels') == []:
+            sets.update({'fuels': None})
 
-        handles, labels = ax.get_legend_handles_labels()
-        fig.legend(handles=handles, labels=labels, fontsize=fs_legend)
+        if sets.get('period') is None or sets.get('period') == ():
+            sets.update({'period': self.get_default_period()})
 
-        return fig
+        if sets.get('regions') == ['Todos'] or sets.get('regions') == []:
+            sets.update({'regions': None})
+
+        if sets.get('resales') == ['Todos'] or sets.get('resales') == []:
+            sets.update({'resales': None})
+
+        if sets.get('states') == ['Todos'] or sets.get('states') == []:
+            sets.update({'states': None})
+
+        return sets
 
     # Getters
     def get_dataframe(self,
@@ -312,18 +381,13 @@ class FuelData():
 
         new_df = self.__df[columns].copy()
 
-        if capitalize:
-            if 'Municipio' in columns:
-                new_df['Municipio'] = new_df['Municipio'].map(word_capitalize)
-
-            if 'Revenda' in columns:
-                new_df['Revenda'] = new_df['Revenda'].map(word_capitalize)
-
-            if 'Produto' in columns:
-                new_df['Produto'] = new_df['Produto'].map(word_capitalize)
+        for column in new_df.select_dtypes('category').columns:
+            new_df[column] = new_df[column].cat.remove_unused_categories()
 
-            if 'Bandeira' in columns:
-                new_df['Bandeira'] = new_df['Bandeira'].map(word_capitalize)
+        if capitalize:
+            for column in ['Municipio', 'Revenda', 'Produto', 'Bandeira']:
+                if column in columns:
+                    new_df[column] = self.get_labels().relabel(new_df[column])
 
         if format:
             if 'Data da Coleta' in columns:
@@ -340,109 +404,279 @@ class FuelData():
 
         return new_df
 
-    def get_regions(self) -> np.ndarray:
-        base = self.__df['Regiao - Sigla'].unique()
-        return np.sort(base)
+    def get_time_bucket(self) -> str:
+        def compute() -> str:
+            dates = self.__cube()['Data da Coleta']
+            return time_bucket(dates.min(), dates.max())
 
-    def get_states(self, regions: list = []) -> np.ndarray:
-        base = self.__df.copy()
+        return self.__cached(compute, 'time_bucket')
 
-        if regions != []:
-            base.query('`Regiao - Sigla` == @regions', inplace=True)
+    def get_page(self,
+                 columns: list = [],
+                 page: int = 1,
+                 page_size: int = PAGE_SIZE,
+                 sort_by: str | None = None,
+                 ascending: bool = True) -> tuple[pd.DataFrame, int]:
 
-        return np.sort(base['Estado - Sigla'].unique())
+        columns_raw = self.__dataset.get_columns()
+        columns = columns if len(columns) > 0 else columns_raw
 
-    def get_cities(self, states: list = [], option_all: bool = False) -> np.ndarray:  # noqa: E501
-        base = self.__df.copy()
+        for column in columns + ([sort_by] if sort_by is not None else []):
+            if column not in columns_raw:
+                raise ValueError(
+                    f"'{str(column)}' is not an accepted value. Option only accepts: "  # noqa: E501
+                    "'Regiao - Sigla', 'Estado - Sigla', 'Municipio', 'Revenda', "  # noqa: E501
+                    "'CNPJ da Revenda', 'Produto', 'Data da Coleta', 'Valor de Venda', "  # noqa: E501
+                    "'Valor de Compra' or 'Bandeira'"
+                )
 
-        if states != []:
-            base.query('`Estado - Sigla` == @states', inplace=True)
+        if not isinstance(page, int) or page < 1:
+            raise ValueError(
+                f"'{str(page)}' is not an accepted value. page only accepts: "
+                "integers from 1"
+            )
+
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError(
+                f"'{str(page_size)}' is not an accepted value. page_size only accepts: "  # noqa: E501
+                "integers from 1"
+            )
+
+        total = self.get_amount_records()
+        start = (page - 1) * page_size
+        positions = self.__sort_order(sort_by, ascending)[start:start + page_size]  # noqa: E501
+        rows = positions if self.__rows is None else self.__rows[positions]
+
+        # Only the rows of the page are copied, still raw and typed; unused
+        # categories are dropped so the page ships a page sized dictionary.
+        page = self.__dataset.take(rows, columns)
+
+        for column in page.select_dtypes('category').columns:
+            page[column] = page[column].cat.remove_unused_categories()
+
+        return page, total
 
-        base = np.sort(base['Municipio'].unique())
+    def get_page_style(self, page: pd.DataFrame) -> Styler:
+        formatters = {}
+
+        for column in page.columns:
+            if column in ['Municipio', 'Revenda', 'Produto', 'Bandeira']:
+                formatters[column] = self.get_labels().get_formatter(column)
+            elif column == 'Data da Coleta':
+                formatters[column] = '{:%d/%m/%Y}'
+            elif column in ['Valor de Venda', 'Valor de Compra']:
+                formatters[column] = self.__currency_format
+
+        return page.style.format(formatters, na_rep='—')
+
+    def iter_export(self,
+                    format: ExportFormat = 'csv',
+                    columns: list = [],
+                    decimal: str = ',',
+                    chunk_size: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+
+        if format not in ['csv', 'parquet']:
+            raise ValueError(
+                f"'{str(format)}' is not an accepted value. format only accepts: "  # noqa: E501
+                "'csv' or 'parquet'"
+            )
+
+        if decimal not in [',', '.']:
+            raise ValueError(
+                f"'{str(decimal)}' is not an accepted value. decimal only accepts: "  # noqa: E501
+                "',' or '.'"
+            )
+
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError(
+                f"'{str(chunk_size)}' is not an accepted value. chunk_size only accepts: "  # noqa: E501
+                "integers from 1"
+            )
+
+        dataset = self.__dataset
+        columns_raw = dataset.get_columns()
+        columns = columns if len(columns) > 0 else columns_raw
+
+        for column in columns:
+            if column not in columns_raw:
+                raise ValueError(
+                    f"'{str(column)}' is not an accepted value. Option only accepts: "  # noqa: E501
+                    "'Regiao - Sigla', 'Estado - Sigla', 'Municipio', 'Revenda', "  # noqa: E501
+                    "'CNPJ da Revenda', 'Produto', 'Data da Coleta', 'Valor de Venda', "  # noqa: E501
+                    "'Valor de Compra' or 'Bandeira'"
+                )
+
+        rows = self.__rows
+        total = self.get_amount_records()
+
+        # Only one chunk of the view is copied at a time.
+        def chunks() -> Iterator[pd.DataFrame]:
+            for start in range(0, max(total, 1), chunk_size):
+                stop = min(start + chunk_size, total)
+                positions = np.arange(start, stop) if rows is None \
+                    else rows[start:stop]
+                yield dataset.take(positions, columns)
+
+        if format == 'csv':
+            return csv_chunks(chunks(), decimal)
+
+        schema = pa.Schema.from_pandas(dataset.take(np.arange(0), columns),
+                                       preserve_index=False)
+        return parquet_chunks(chunks(), schema)
+
+    def export(self,
+               target: BinaryIO,
+               format: ExportFormat = 'csv',
+               columns: list = [],
+               decimal: str = ',',
+               chunk_size: int = EXPORT_CHUNK_ROWS) -> int:
+        size = 0
+
+        for data in self.iter_export(format, columns, decimal, chunk_size):
+            target.write(data)
+            size += len(data)
+
+        return size
+
+    def get_view_bytes(self) -> int:
+        rows = self.__rows.nbytes if self.__rows is not None else 0
+        return rows + frame_bytes(self.__view)
+
+    def release_view(self) -> None:
+        # The copied rows are taken again from the dataset when needed.
+        self.__view = None
+
+    def get_spec(self) -> tuple:
+        return self.__spec
+
+    def get_labels(self) -> FuelLabels:
+        return self.__dataset.get_labels()
+
+    def get_dataset(self) -> FuelBackend:
+        return self.__dataset
+
+    def get_date_bounds(self) -> tuple[datetime, datetime]:
+        return self.__dataset.get_date_bounds()
+
+    def get_default_period(self) -> tuple[datetime, datetime]:
+        return self.__dataset.get_default_period()
+
+    def get_memory_report(self) -> pd.DataFrame:
+        return self.__dataset.get_memory_report()
+
+    def get_regions(self) -> np.ndarray:
+        return self.__options('regions', {})
+
+    def get_states(self, regions: list = []) -> np.ndarray:
+        return self.__options('states', {'regions': regions or None})
+
+    def get_cities(self, states: list = [], option_all: bool = False) -> np.ndarray:  # noqa: E501
+        base = self.__options('cities', {'states': states or None})
 
         return base if not option_all else self.__include_all_option(base)
 
     def get_resales(self, sets: dict = None, option_all: bool = True) -> np.ndarray:  # type: ignore # noqa: E501
-        df = self.set_fuel(sets)
-        subset = df['CNPJ da Revenda'].isin(df['CNPJ da Revenda'].unique())  # type: ignore # noqa: E501
-        resales = df[subset][['Revenda', 'CNPJ da Revenda']]  # type: ignore # noqa: E501
-        resales = np.sort(resales['Revenda'].unique())
+        resales = self.__options('resales', self.__normalize_sets(sets))
         return self.__include_all_option(resales) if option_all else resales
 
     def get_fuels(self, sets: dict = None) -> np.ndarray:  # type: ignore
-        return np.sort(self.set_fuel(sets)['Produto'].unique())  # type: ignore
+        return self.__options('fuels', self.__normalize_sets(sets))
 
     def get_flags(self, sets: dict = None) -> np.ndarray:  # type: ignore
-        return np.sort(self.set_fuel(sets)['Bandeira'].unique())  # type: ignore # noqa: E501
+        return self.__options('flags', self.__normalize_sets(sets))
 
     def get_amount_records(self) -> int:
-        return self.__df.shape[0]
+        if self.__rows is None:
+            return self.__dataset.get_amount_records()
+
+        return self.__rows.shape[0]
+
+    def get_cache_stats(self) -> dict:
+        return self.__dataset.get_cache().get_stats()
+
+    def get_metric_values(self) -> dict:
+        def compute() -> dict:
+            # Every card and ratio comes from the same per product summary.
+            summary = roll_up(self.__cube(), ['Produto'])
+
+            products = {
+                produto: {
+                    measure: self.__sale_value(summary, measure, produto)
+                    for measure in ['min', 'max', 'mean']
+                }
+                for produto in PRODUCTS
+            }
+
+            cost_benefit = {
+                other_fuel: {
+                    operation: self.__cost_benefit(summary, other_fuel, operation)  # noqa: E501
+                    for operation in OPERATIONS
+                }
+                for other_fuel in COST_BENEFIT_FUELS
+            }
+
+            return {'products': products, 'cost_benefit': cost_benefit}
+
+        return self.__cached(compute, 'metric_values')
+
+    def get_metrics(self) -> FuelMetrics:
+        def compute() -> FuelMetrics:
+            values = self.get_metric_values()
+
+            products = {
+                produto: ProductMetrics(
+                    *(self.__currency_format(measures[measure])
+                      for measure in ['min', 'max', 'mean'])
+                )
+                for produto, measures in values['products'].items()
+            }
+
+            cost_benefit = {
+                other_fuel: {
+                    operation: f'{ratio:.1f} %'.replace('.', ',')
+                    for operation, ratio in ratios.items()
+                }
+                for other_fuel, ratios in values['cost_benefit'].items()
+            }
+
+            return FuelMetrics(products, cost_benefit)
+
+        return self.__cached(compute, 'metrics')
 
     def get_max_sale_value_of_product(self, produto: str) -> str:
-        result = self.__df.query('Produto == @produto')['Valor de Venda'].max()
-        result = float(result) if not isnan(result) else float(0)
-        return self.__currency_format(result)
+        metrics = self.get_metrics().products.get(produto)
+
+        if metrics is None:
+            return self.__currency_format(float(0))
+
+        return metrics.max
 
     def get_min_sale_value_of_product(self, produto: str) -> str:
-        result = self.__df.query('Produto == @produto')['Valor de Venda'].min()
-        result = float(result) if not isnan(result) else float(0)
-        return self.__currency_format(result)
+        metrics = self.get_metrics().products.get(produto)
+
+        if metrics is None:
+            return self.__currency_format(float(0))
+
+        return metrics.min
 
     def get_chart_sales_value_by_region(self, pyplot_method: Callable) -> None:  # noqa: E501
         columns = ['Regiao - Sigla', 'Produto']
-        average_regions = self.__df.groupby(by=columns).mean(
-            numeric_only=True).round(3)
-        average_regions.drop(['Valor de Compra'], axis=1, inplace=True)
-        average_regions = average_regions.unstack(level=1)
-        average_regions.columns.names = [None, None]
+        average_regions = self.__average_sales(columns).unstack(level=1)
+        average_regions.columns.name = None
         average_regions.index.name = None
-        average_regions.columns = average_regions.columns.droplevel()
 
-        pyplot_method(self.__plot_bar(average_regions, display_bar_label=True))
+        pyplot_method(plot_bar(average_regions,
+                               display_bar_label=True,
+                               labels=self.__product_labels()))
 
     def get_chart_sales_value_by_regions_and_states(self, pyplot_method: Callable) -> None:  # noqa: E501
-        columns = ['Regiao - Sigla', 'Estado - Sigla', 'Produto']
-        average_states = self.__df.groupby(by=columns).mean(
-            numeric_only=True).round(3)
-        average_states.drop(['Valor de Compra'], axis=1, inplace=True)
-        average_states = average_states.unstack(level=2)
-        regions = average_states.index.get_level_values(level=0).unique()
-
-        for region in regions:
-            sheet = average_states.loc[region]
-            sheet.columns = sheet.columns.droplevel(level=0)
-            sheet.columns.name = None
-            sheet.index.name = None
-
-            regions_dict = {
-                'CO': 'Centro-Oeste',
-                'N': 'Norte',
-                'NE': 'Nordeste',
-                'S': 'Sul',
-                'SE': 'Sudeste'
-            }
-
+        for sheet, suptitle in self.__region_sheets():
             pyplot_method(
-                self.__plot_bar(
-                    sheet,
-                    f'Região: {regions_dict[region]}',
-                    True,
-                    True
-                )
-            )
+                plot_bar(sheet, suptitle, True, True, self.__product_labels()))
 
     def get_chart_sales_value_by_cities(self) -> plt.Figure:
-        columns = ['Municipio', 'Produto', 'Valor de Venda']
-        data = self.get_dataframe(columns, True)
-        number_cities = data['Municipio'].unique().shape[0]
-
-        if number_cities > 4:
-            raise ExcessValues(
-                f'This search generated many results, about {number_cities}'
-                ' cities were selected, so it is not possible to display the'
-                ' information clearly. A maximum of 4 cities must be selected'
-                ' for information to be displayed.'
-            )
+        data = self.__check_amount(
+            self.get_chart_data('cities'), 'Municipio', 'cities', 4)
 
         fs_bar_label = 9
         fs_legend = 10
@@ -525,17 +759,8 @@ class FuelData():
         return fig
 
     def get_chart_sales_value_by_flags(self) -> plt.figure:
-        columns = ['Bandeira', 'Produto', 'Valor de Venda']
-        data = self.get_dataframe(columns, True)
-        number_flags = data['Bandeira'].unique().shape[0]
-
-        if number_flags > 5:
-            raise ExcessValues(
-                f'This search generated many results, about {number_flags}'
-                ' flags were selected, so it is not possible to display the'
-                ' information clearly. A maximum of 5 flags must be selected'
-                ' for information to be displayed.'
-            )
+        data = self.__check_amount(
+            self.get_chart_data('flags'), 'Bandeira', 'flags', 5)
 
         fs_bar_label = 9
         fs_legend = 10
@@ -610,37 +835,8 @@ class FuelData():
         return fig
 
     def get_chart_evolution_of_sales_values_over_time(self):
-        columns = ['Produto', 'Data da Coleta', 'Valor de Venda']
-
-        data = self.__df[columns].copy()
-        data['Produto'] = data['Produto'].map(word_capitalize)
-
-        months = {
-            1: 'Janeiro',
-            2: 'Fevereiro',
-            3: 'Março',
-            4: 'Abril',
-            5: 'Maio',
-            6: 'Junho',
-            7: 'Julho',
-            8: 'Agosto',
-            9: 'Setembro',
-            10: 'Outubro',
-            11: 'Novembro',
-            12: 'Dezembro'
-        }
-
-        if 'Mes' in data.columns:
-            data.drop(columns=['Mes'], axis=1, inplace=True)
-
-        dates = pd.DatetimeIndex(data['Data da Coleta'])
-        data['Mes'] = dates.month.map(months)
-
-        inicial_date = data['Data da Coleta'].min()
-        final_date = data['Data da Coleta'].max()
-        delta = final_date - inicial_date
-
-        x = 'Mes' if delta.days > 45 else 'Data da Coleta'
+        data = self.get_chart_data('evolution')
+        _, date_format = TIME_BUCKETS[self.get_time_bucket()]
 
         sns.set_theme(
             context='notebook',
@@ -657,7 +853,7 @@ class FuelData():
         order_fuels = ['Etanol', 'Gasolina', 'Gasolina Aditivada']
 
         chart = sns.relplot(
-            x=x,
+            x='Data da Coleta',
             y='Valor de Venda',
             data=data,
             col_order=order_fuels,
@@ -674,12 +870,94 @@ class FuelData():
             errorbar=None
         )
 
-        chart.set_xticklabels(rotation=15, ha='center')
+        chart.ax.xaxis.set_major_formatter(mdates.DateFormatter(date_format))
+        chart.ax.tick_params(axis='x', labelrotation=15)
 
         chart.tight_layout(w_pad=0)
 
         return chart.fig
 
+    def get_chart_data(self, kind: ChartKind) -> pd.DataFrame:
+        self.__check_kind(kind)
+
+        match kind:
+            case 'region':
+                return self.__average_sales_by('Regiao - Sigla')
+            case 'regions_and_states':
+                return self.__average_sales_by('Regiao - Sigla', 'Estado - Sigla')  # noqa: E501
+            case 'cities':
+                return self.__average_sales_by('Municipio')
+            case 'flags':
+                return self.__average_sales_by('Bandeira')
+            case _:
+                return self.__evolution_sales()
+
+    def get_chart_specs(self, kind: ChartKind) -> list[alt.Chart]:
+        data = self.get_chart_data(kind)
+
+        # Only the aggregated rows go into the specs; the browser draws them.
+        match kind:
+            case 'region':
+                return [bar_chart(data, 'Regiao - Sigla', 'Região')]
+            case 'regions_and_states':
+                return [
+                    bar_chart(sheet.drop(columns=['Regiao - Sigla']),
+                              'Estado - Sigla',
+                              'Estado(s)',
+                              f'Região: {REGION_NAMES[region]}')
+                    for region, sheet in data.groupby('Regiao - Sigla', observed=True)  # noqa: E501
+                ]
+            case 'cities':
+                data = self.__check_amount(data, 'Municipio', 'cities', 4)
+                return [bar_chart(data, 'Municipio', 'Município(s)')]
+            case 'flags':
+                data = self.__check_amount(data, 'Bandeira', 'flags', 5)
+                return [bar_chart(data, 'Bandeira', 'Bandeira(s)')]
+            case _:
+                return [line_chart(data, self.get_time_bucket())]
+
+    def get_chart_images(self,
+                         kind: ChartKind,
+                         dpi: int = CHART_DPI,
+                         workers: int | None = None) -> tuple[bytes, ...]:
+        self.__check_kind(kind)
+
+        if not isinstance(dpi, int) or dpi <= 0:
+            raise ValueError(
+                f"'{str(dpi)}' is not an accepted value. dpi only accepts: "
+                "positive integers"
+            )
+
+        def compute() -> tuple[bytes, ...]:
+            with timer(f'render {kind} ({dpi} dpi)'):
+                return render()
+
+        def render() -> tuple[bytes, ...]:
+            processes = workers or RENDER_WORKERS or os.cpu_count() or 1
+
+            # The state charts are independent figures, one per region, so
+            # they are drawn side by side by the renderer processes.
+            if kind == 'regions_and_states' and processes > 1:
+                sheets = self.__region_sheets()
+
+                if len(sheets) > 1:
+                    return tuple(render_bars(sheets, dpi, processes, self.__product_labels()))  # noqa: E501
+
+            images = []
+
+            for figure in self.__figures(kind):
+                buffer = BytesIO()
+                figure.savefig(buffer, format='png', dpi=dpi)
+                plt.close(figure)
+                images.append(buffer.getvalue())
+
+            return tuple(images)
+
+        # The encoded images are kept apart from the filter results, so that
+        # a few high resolution charts do not evict the cheaper entries.
+        cache = self.__dataset.get_render_cache()
+        return cache.get_or_compute((self.__spec, kind, dpi), compute)
+
     def get_ethanol_cost_benefit(self, other_fuel: Fuel = 'GASOLINA', operation: Operation = 'Médio') -> str:  # noqa: E501
 
         if other_fuel not in ['GASOLINA', 'GASOLINA ADITIVADA']:
@@ -694,58 +972,57 @@ class FuelData():
                 "'Mínimo', 'Máximo' or 'Médio'"
             )
 
-        ethanol = self.__df.query('Produto == "ETANOL"')['Valor de Venda']
-        other = self.__df.query('Produto == @other_fuel')['Valor de Venda']
-
-        match operation:
-            case 'Mínimo':
-                ethanol = ethanol.min(numeric_only=True)
-                other = other.min(numeric_only=True)
-            case 'Máximo':
-                ethanol = ethanol.max(numeric_only=True)
-                other = other.max(numeric_only=True)
-            case 'Médio':
-                ethanol = ethanol.mean(numeric_only=True)
-                other = other.mean(numeric_only=True)
-
-        cost_benefit = round(ethanol / other * 100, 1)
-        cost_benefit = cost_benefit if not isnan(cost_benefit) else 0
-
-        return f'{cost_benefit:.1f} %'.replace('.', ',')
+        return self.get_metrics().cost_benefit[other_fuel][operation]
 
     # Setters
     def set_period(self, inicial_date: datetime, final_date: datetime) -> None:
-        self.__df.query('`Data da Coleta` >= @inicial_date and `Data da Coleta` <= @final_date', inplace=True)  # noqa: E501
+        period = (inicial_date, final_date)
+        self.__restrict(self.__select({'period': period}),
+                        filter_spec({'period': period}),
+                        {'period': period})
 
     def set_regions(self, regions: list) -> None:
-        self.__df.query('`Regiao - Sigla` == @regions', inplace=True)
+        self.__narrow(self.__df.eval('`Regiao - Sigla` == @regions'),
+                      ('set_regions', str(regions)))
 
     def set_state(self, state: str) -> None:
-        self.__df.query('`Estado - Sigla` == @state', inplace=True)
+        self.__narrow(self.__df.eval('`Estado - Sigla` == @state'),
+                      ('set_state', str(state)))
 
     def set_county(self, county: str) -> None:
-        self.__df.query('Municipio == @county', inplace=True)
+        self.__narrow(self.__df.eval('Municipio == @county'),
+                      ('set_county', str(county)))
 
     def set_resale(self, resale: str) -> None:
-        self.__df.query('Revenda == @resale', inplace=True)
+        self.__narrow(self.__df.eval('Revenda == @resale'),
+                      ('set_resale', str(resale)))
 
     def set_fuels(self, fuels: list) -> None:
-        self.__df.query('Produto == @fuels', inplace=True)
+        self.__narrow(self.__df.eval('Produto == @fuels'),
+                      ('set_fuels', str(fuels)))
 
     def set_flags(self, flags: list) -> None:
-        self.__df.query('Bandeira == @flags', inplace=True)
+        self.__narrow(self.__df.eval('Bandeira == @flags'),
+                      ('set_flags', str(flags)))
 
-    def set_fuel(self, sets: dict = None, inplace: bool = False) -> pd.DataFrame | None:  # type: ignore # noqa: E501
+    def set_fuel(self, sets: dict = None, inplace: bool = False, engine: FilterEngine = 'index') -> pd.DataFrame | None:  # type: ignore # noqa: E501
 
-        _default = {
-            'cities': None,
-            'flags': None,
-            'fuels': None,
-            'period': (DATE_START, DATE_END),
-            'regions': None,
-            'resales': None,
-            'states': None
-        }
+        if engine not in ['index', 'query']:
+            raise ValueError(
+                f"'{str(engine)}' is not an accepted value. engine only accepts: "  # noqa: E501
+                "'index' or 'query'"
+            )
+
+        sets = self.__normalize_sets(sets)
+
+        if engine == 'index':
+            rows = self.__select(sets)
+
+            if inplace:
+                self.__restrict(rows, filter_spec(sets), dict(sets))
+                return None
+
+            return self.__dataset.take(rows)
 
         _filters = {
             'cities': "Municipio == @sets.get('cities')",
@@ -757,50 +1034,6 @@ class FuelData():
             'states': "`Estado - Sigla` == @sets.get('states')"
         }
 
-        if sets is None:
-            sets = _default
-
-        if isinstance(sets, dict):
-            keys_sets = list(sets.keys())
-            keys_sets.sort()
-
-            keys_default = list(_default.keys())
-            keys_default.sort()
-
-            if keys_sets != keys_default:
-                raise ValueError(
-                    "All keys must be declared."
-                    " The dictionary must contain all of the following keys: 'period', 'regions', 'states', 'cities', 'resales', 'fuels', 'flags'."  # noqa: E501
-                    " Even if you don't need to use a certain key, you must declare it with a value of type None."  # noqa: E501
-                )
-        else:
-            raise TypeError(
-                f"'{str(sets)}' is of type '{str(type(sets))}', which is not an accepted type."  # noqa: E501
-                " value only accepts: dict only"
-                " Please convert the value to an accepted type."
-            )
-
-        if sets.get('cities') == ['Todos'] or sets.get('cities') == []:
-            sets.update({'cities': None})
-
-        if sets.get('flags') == ['Todos'] or sets.get('flags') == []:
-            sets.update({'flags': None})
-
-        if sets.get('fuels') == ['Todos'] or sets.get('fuels') == []:
-            sets.update({'fuels': None})
-
-        if sets.get('period') is None or sets.get('period') == ():
-            sets.update({'period': (DATE_START, DATE_END)})
-
-        if sets.get('regions') == ['Todos'] or sets.get('regions') == []:
-            sets.update({'regions': None})
-
-        if sets.get('resales') == ['Todos'] or sets.get('resales') == []:
-            sets.update({'resales': None})
-
-        if sets.get('states') == ['Todos'] or sets.get('states') == []:
-            sets.update({'states': None})
-
         keys = list(sets.keys())
         keys.sort()
         expr = ''
@@ -809,6 +1042,8 @@ class FuelData():
             if sets.get(key) is not None:
                 expr += _filters.get(key) if expr == '' else f' & {_filters.get(key)}'  # type: ignore # noqa: E501
 
-        _df = self.__df.query(expr=expr, inplace=inplace)
+        if inplace:
+            self.__narrow(self.__df.eval(expr), filter_spec(sets))
+            return None
 
-        return None if inplace else _df
+        return self.__df.query(expr=expr)
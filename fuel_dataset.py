@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (load_source, memory_report, sort_by_date,
+                         source_version)
+from fuel_backend import FuelBackend
+from fuel_cube import FuelCube, aggregate
+from fuel_hierarchy import FuelHierarchy
+from fuel_index import FuelIndex
+from fuel_labels import LABEL_COLUMNS, FuelLabels
+from memory_accounting import frame_bytes, object_bytes
+from settings import (CSV_CHUNK_SIZE, DATA_DIR, RENDER_CACHE_MAX_BYTES,
+                      RESULT_CACHE_MAX_BYTES, STORAGE_BACKEND)
+from sqlite_dataset import SQLiteDataset
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+class FuelDataset(FuelBackend):
+
+    # Constructor
+    def __init__(self,
+                 source: Path | None = None,
+                 rebuild_cache: bool = False,
+                 chunksize: int | None = CSV_CHUNK_SIZE,
+                 max_workers: int | None = None,
+                 cache_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 render_bytes: int = RENDER_CACHE_MAX_BYTES) -> None:
+        source = source if source is not None else BASE_DIR / DATA_DIR
+
+        # Rows are kept in collection date order so that a period is always
+        # a contiguous slice of the frame.
+        self.__df = sort_by_date(load_source(
+            source,
+            rebuild=rebuild_cache,
+            chunksize=chunksize,
+            max_workers=max_workers
+        ))
+
+        dates = self.__df['Data da Coleta']
+
+        super().__init__(
+            dates.min().to_pydatetime(),
+            dates.max().to_pydatetime(),
+            FuelLabels({column: self.__df[column].cat.categories
+                        for column in LABEL_COLUMNS}),
+            source_version(source),
+            cache_bytes,
+            render_bytes
+        )
+
+        self.__index = FuelIndex(self.__df)
+        self.__hierarchy = FuelHierarchy(self.__df)
+        self.__cube = FuelCube(self.__df)
+
+        # The frame and the structures built over it never change, so they
+        # are measured once instead of on every memory check.
+        self.__memory_usage = [
+            ('dataset frame', 1, frame_bytes(self.__df)),
+            ('price cube', 1, frame_bytes(self.__cube.get_frame())),
+            ('index, hierarchy and labels', 3, object_bytes(
+                self.__index, self.__hierarchy, self.get_labels()))
+        ]
+
+    # Getters
+    def get_frame(self) -> pd.DataFrame:
+        return self.__df
+
+    def get_index(self) -> FuelIndex:
+        return self.__index
+
+    def get_hierarchy(self) -> FuelHierarchy:
+        return self.__hierarchy
+
+    def get_cube(self) -> FuelCube:
+        return self.__cube
+
+    def get_amount_records(self) -> int:
+        return self.__df.shape[0]
+
+    def get_columns(self) -> list[str]:
+        return self.__df.columns.tolist()
+
+    def get_rows(self, sets: dict) -> np.ndarray:
+        return self.__index.get_rows(sets)
+
+    def take(self,
+             rows: np.ndarray | None,
+             columns: list | None = None) -> pd.DataFrame:
+        frame = self.__df if columns is None else self.__df[columns]
+        return frame if rows is None else frame.take(rows)
+
+    def get_cells(self, sets: dict) -> pd.DataFrame:
+        # The cube has no resale dimension: those rows are aggregated here.
+        if sets.get('resales') is not None:
+            return aggregate(self.take(self.get_rows(sets)))
+
+        return self.__cube.get_cells(sets)
+
+    def get_options(self, key: str, sets: dict) -> np.ndarray:
+        # The location tree answers from lookups alone while the period
+        # covers the whole dataset; otherwise the matching rows are resolved
+        # through the index, still without copying the frame.
+        if self.covers_dataset(sets.get('period')):
+            match key:
+                case 'fuels':
+                    return self.__hierarchy.get_fuels(sets, sets.get('flags'))
+                case 'flags':
+                    return self.__hierarchy.get_flags(sets, sets.get('fuels'))
+                case _:
+                    if sets.get('fuels') is None and sets.get('flags') is None:  # noqa: E501
+                        return self.__hierarchy.get_values(key, sets)
+
+        return self.get_values(key, self.get_rows(sets))
+
+    def get_values(self, key: str, rows: np.ndarray) -> np.ndarray:
+        return self.__index.get_dimension(key).get_values(rows)
+
+    def get_memory_usage(self) -> list[tuple[str, int, int]]:
+        return list(self.__memory_usage)
+
+    def get_memory_report(self) -> pd.DataFrame:
+        return memory_report(self.__df)
+
+
+# Storage backends by the name set in STORAGE_BACKEND.
+STORAGE_BACKENDS = {
+    'pandas': FuelDataset,
+    'sqlite': SQLiteDataset
+}
+
+
+def open_dataset(source: Path | None = None,
+                 backend: str = STORAGE_BACKEND) -> FuelBackend:
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(
+            f"'{str(backend)}' is not an accepted value. backend only accepts: "  # noqa: E501
+            "'pandas' or 'sqlite'"
+        )
+
+    return STORAGE_BACKENDS[backend](source if source is not None else BASE_DIR / DATA_DIR)  # noqa: E501
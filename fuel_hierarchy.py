@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+# Location levels, from the root of the tree to its leaves.
+LEVELS = ['regions', 'states', 'cities', 'resales']
+
+LEVEL_COLUMNS = {
+    'regions': 'Regiao - Sigla',
+    'states': 'Estado - Sigla',
+    'cities': 'Municipio',
+    'resales': 'Revenda'
+}
+
+
+class FuelHierarchy():
+
+    # Constructor
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.__categories = {
+            key: df[column].cat.categories for key, column in LEVEL_COLUMNS.items()  # noqa: E501
+        }
+        self.__lookup = {
+            key: {value: code for code, value in enumerate(categories)}
+            for key, categories in self.__categories.items()
+        }
+        self.__products = df['Produto'].cat.categories
+        self.__flags = df['Bandeira'].cat.categories
+
+        # One row per distinct region / state / city / resale / product /
+        # flag combination, holding category codes only (-1 for missing).
+        combos = pd.DataFrame({
+            key: df[column].cat.codes for key, column in LEVEL_COLUMNS.items()
+        })
+        combos['pairs'] = ((df['Produto'].cat.codes.astype(np.int64) + 1)
+                           * (len(self.__flags) + 1)
+                           + df['Bandeira'].cat.codes + 1)
+        combos = combos.drop_duplicates()
+
+        self.__root = {}
+
+        for key in LEVELS + ['pairs']:
+            codes = np.unique(combos[key].to_numpy())
+            self.__root[key] = codes[codes >= 0]
+
+        # __nodes[depth][path] maps a node, named by the codes on the path
+        # from the root, to the sorted codes found under it for each deeper
+        # level and for the product / flag pairs. __members[depth] lists the
+        # nodes of a depth by their own code.
+        self.__nodes = []
+        self.__members = []
+
+        for depth in range(len(LEVELS)):
+            path = LEVELS[:depth + 1]
+            nodes = {}
+
+            for key in LEVELS[depth + 1:] + ['pairs']:
+                for node, values in self.__group(combos, path, key).items():
+                    nodes.setdefault(node, {})[key] = values
+
+            members = {}
+
+            for node in nodes:
+                members.setdefault(node[-1], []).append(node)
+
+            self.__nodes.append(nodes)
+            self.__members.append(members)
+
+    # private methods
+    def __group(self, combos: pd.DataFrame, path: list, key: str) -> dict:
+        data = combos[path + [key]].drop_duplicates()
+        data = data[(data >= 0).all(axis=1)].sort_values(path + [key])
+        prefix = data[path].to_numpy()
+        starts = np.flatnonzero(np.any(prefix[1:] != prefix[:-1], axis=1)) + 1
+        keys = map(tuple, prefix[np.concatenate([[0], starts])].tolist())
+        return dict(zip(keys, np.split(data[key].to_numpy(), starts)))
+
+    def __codes(self, level: str, values: list | str | None) -> set | None:
+        if values is None:
+            return None
+
+        if isinstance(values, str):
+            values = [values]
+
+        lookup = self.__lookup[level]
+        return {lookup[value] for value in values if value in lookup}
+
+    def __collect(self, sets: dict, key: str) -> np.ndarray:
+        selections = [self.__codes(level, sets.get(level)) for level in LEVELS]
+        filtered = [depth for depth, codes in enumerate(selections)
+                    if codes is not None]
+
+        if len(filtered) == 0:
+            return self.__root[key]
+
+        # Start from the deepest filtered level and keep the nodes whose
+        # ancestors also match the upper filters.
+        depth = filtered[-1]
+        parts = []
+
+        for code in selections[depth]:
+            for node in self.__members[depth].get(code, []):
+                if any(selections[upper] is not None
+                       and node[upper] not in selections[upper]
+                       for upper in range(depth)):
+                    continue
+
+                values = self.__nodes[depth][node]
+
+                if key in values:
+                    parts.append(values[key])
+                else:
+                    # The node itself, or one of its ancestors, is the value.
+                    parts.append(np.array([node[LEVELS.index(key)]]))
+
+        if len(parts) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        return np.unique(np.concatenate(parts))
+
+    def __indexer(self, categories: pd.Index, values: list | str) -> np.ndarray:  # noqa: E501
+        values = [values] if isinstance(values, str) else values
+        return categories.get_indexer(pd.Index(values, dtype=object))
+
+    def __pairs(self, sets: dict) -> tuple[np.ndarray, np.ndarray]:
+        products, flags = np.divmod(self.__collect(sets, 'pairs'),
+                                    len(self.__flags) + 1)
+        return products - 1, flags - 1
+
+    # Getters
+    def get_values(self, level: str, sets: dict) -> np.ndarray:
+        codes = self.__collect(sets, level)
+        return self.__categories[level].to_numpy()[codes]
+
+    def get_fuels(self, sets: dict, flags: list | None = None) -> np.ndarray:
+        products, flag_codes = self.__pairs(sets)
+
+        if flags is not None:
+            codes = self.__indexer(self.__flags, flags)
+            products = products[np.isin(flag_codes, codes)]
+
+        # The products already filtered stay the only ones offered.
+        if sets.get('fuels') is not None:
+            codes = self.__indexer(self.__products, sets.get('fuels'))
+            products = products[np.isin(products, codes)]
+
+        products = np.unique(products)
+        return self.__products.to_numpy()[products[products >= 0]]
+
+    def get_flags(self, sets: dict, fuels: list | None = None) -> np.ndarray:
+        products, flag_codes = self.__pairs(sets)
+
+        if fuels is not None:
+            codes = self.__indexer(self.__products, fuels)
+            flag_codes = flag_codes[np.isin(products, codes)]
+
+        if sets.get('flags') is not None:
+            codes = self.__indexer(self.__flags, sets.get('flags'))
+            flag_codes = flag_codes[np.isin(flag_codes, codes)]
+
+        flag_codes = np.unique(flag_codes)
+        return self.__flags.to_numpy()[flag_codes[flag_codes >= 0]]
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# Keys of the set_fuel filter dictionary and the column each one filters.
+DIMENSIONS = {
+    'regions': 'Regiao - Sigla',
+    'states': 'Estado - Sigla',
+    'cities': 'Municipio',
+    'resales': 'Revenda',
+    'fuels': 'Produto',
+    'flags': 'Bandeira'
+}
+
+
+class DimensionIndex():
+
+    # Constructor
+    def __init__(self, column: pd.Series) -> None:
+        codes = column.cat.codes.to_numpy()
+        dtype = np.int32 if codes.shape[0] < np.iinfo(np.int32).max else np.int64  # noqa: E501
+
+        self.__categories = column.cat.categories
+        self.__codes = codes
+
+        # Row ids grouped by category code and ascending inside each group:
+        # the rows of code k are __rows[__offsets[k]:__offsets[k + 1]].
+        self.__rows = np.argsort(codes, kind='stable').astype(dtype)
+        counts = np.bincount(codes[codes >= 0],
+                             minlength=len(self.__categories))
+        self.__offsets = np.count_nonzero(codes < 0) + np.concatenate(
+            [[0], np.cumsum(counts)]
+        )
+
+    # Getters
+    def get_codes(self, values: list) -> np.ndarray:
+        codes = self.__categories.get_indexer(pd.Index(values, dtype=object))
+        return np.unique(codes[codes >= 0])
+
+    def get_bounds(self, code: int, start: int, stop: int) -> tuple:
+        first, last = self.__offsets[code], self.__offsets[code + 1]
+        rows = self.__rows[first:last]
+        return (first + np.searchsorted(rows, start),
+                first + np.searchsorted(rows, stop))
+
+    def get_size(self, codes: np.ndarray, start: int, stop: int) -> int:
+        bounds = [self.get_bounds(code, start, stop) for code in codes]
+        return sum(int(last - first) for first, last in bounds)
+
+    def get_rows(self, codes: np.ndarray, start: int, stop: int) -> np.ndarray:  # noqa: E501
+        parts = []
+
+        for code in codes:
+            first, last = self.get_bounds(code, start, stop)
+            parts.append(self.__rows[first:last])
+
+        if len(parts) == 0:
+            return np.empty(0, dtype=self.__rows.dtype)
+
+        return np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+
+    def get_values(self, rows: np.ndarray) -> np.ndarray:
+        present = np.bincount(self.__codes[rows] + 1,
+                              minlength=len(self.__categories) + 1)[1:] > 0
+        return self.__categories.to_numpy()[present]
+
+    def get_mask(self, rows: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        allowed = np.zeros(len(self.__categories), dtype=bool)
+        allowed[codes] = True
+        row_codes = self.__codes[rows]
+        return allowed[row_codes] & (row_codes >= 0)
+
+
+class FuelIndex():
+
+    # Constructor
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.__size = df.shape[0]
+        self.__dates = df['Data da Coleta'].to_numpy()
+        self.__indexes = {
+            key: DimensionIndex(df[column])
+            for key, column in DIMENSIONS.items() if column in df.columns
+        }
+
+    # Getters
+    def get_dimension(self, key: str) -> DimensionIndex:
+        return self.__indexes[key]
+
+    def get_period(self, period: tuple | None) -> tuple[int, int]:
+        if period is None:
+            return 0, self.__size
+
+        # Rows are sorted by date, so the period is one contiguous slice.
+        inicial_date = np.datetime64(pd.Timestamp(period[0]))
+        final_date = np.datetime64(pd.Timestamp(period[1]))
+
+        return (int(np.searchsorted(self.__dates, inicial_date, 'left')),
+                int(np.searchsorted(self.__dates, final_date, 'right')))
+
+    def get_rows(self, sets: dict) -> np.ndarray:
+        start, stop = self.get_period(sets.get('period'))
+        selected = []
+
+        for key, index in self.__indexes.items():
+            values = sets.get(key)
+
+            if values is None:
+                continue
+
+            if isinstance(values, str):
+                values = [values]
+
+            codes = index.get_codes(values)
+            selected.append((index.get_size(codes, start, stop), index, codes))
+
+        if len(selected) == 0:
+            return np.arange(start, stop)
+
+        # OR inside the most selective dimension, then AND the others by
+        # looking up their category codes on the surviving rows.
+        selected.sort(key=lambda item: item[0])
+        _, index, codes = selected[0]
+        rows = index.get_rows(codes, start, stop)
+
+        for _, index, codes in selected[1:]:
+            rows = rows[index.get_mask(rows, codes)]
+
+        return rows
@@ -0,0 +1,42 @@
+from typing import Callable
+
+import pandas as pd
+
+from tools import word_capitalize
+
+# Columns whose values are shown capitalized.
+LABEL_COLUMNS = ['Municipio', 'Revenda', 'Produto', 'Bandeira']
+
+
+class FuelLabels():
+
+    # Constructor
+    def __init__(self, categories: dict[str, pd.Index]) -> None:
+        # Display form of every distinct value, computed once at load.
+        self.__lookup = {
+            column: dict(zip(categories[column],
+                             categories[column].map(word_capitalize)))
+            for column in LABEL_COLUMNS
+        }
+
+    # Getters
+    def get_label(self, column: str, value: str) -> str:
+        return self.__lookup[column].get(value, value)
+
+    def get_formatter(self, column: str) -> Callable[[str], str]:
+        lookup = self.__lookup[column]
+        return lambda value: lookup.get(value, value)
+
+    def relabel(self, column: pd.Series) -> pd.Series:
+        if column.name not in self.__lookup:
+            return column
+
+        # Only the categories are looked up, never the rows.
+        categories = column.cat.categories
+        labels = categories.map(self.get_formatter(str(column.name)))
+
+        if labels.is_unique:
+            return column.cat.rename_categories(labels)
+
+        # Values differing only by case share a label.
+        return column.map(dict(zip(categories, labels)))
@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+
+# Operations accepted by the cost-benefit ratios and the measure of the
+# sales summary each one reads.
+OPERATIONS = {
+    'Mínimo': 'min',
+    'Máximo': 'max',
+    'Médio': 'mean'
+}
+
+# Fuels the ethanol is compared to.
+COST_BENEFIT_FUELS = ['GASOLINA', 'GASOLINA ADITIVADA']
+
+
+@dataclass(frozen=True)
+class ProductMetrics:
+    min: str
+    max: str
+    mean: str
+
+
+@dataclass(frozen=True)
+class FuelMetrics:
+    # Formatted sale values by product.
+    products: dict[str, ProductMetrics]
+
+    # Formatted ethanol ratios by compared fuel and then by operation.
+    cost_benefit: dict[str, dict[str, str]]
@@ -0,0 +1,114 @@
+import logging
+import os
+import weakref
+
+import numpy as np
+import pandas as pd
+from matplotlib._pylab_helpers import Gcf
+from pympler import asizeof
+
+from settings import MEMORY_BUDGET_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Every FuelData alive in the process, across sessions.
+_views = weakref.WeakSet()
+
+
+def track_view(view: object) -> None:
+    _views.add(view)
+
+
+def live_views() -> list:
+    return list(_views)
+
+
+def frame_bytes(df: pd.DataFrame | None) -> int:
+    if df is None:
+        return 0
+
+    return int(np.sum(df.memory_usage(deep=True)))
+
+
+def object_bytes(*objects: object) -> int:
+    return asizeof.asizeof(*objects) if objects else 0
+
+
+def process_rss() -> int | None:
+    # Resident memory of the process, where /proc is available.
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def column_report(df: pd.DataFrame) -> pd.DataFrame:
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'bytes': df.memory_usage(index=False, deep=True)
+    })
+    report.loc['Total'] = ['', report['bytes'].sum()]
+
+    return report
+
+
+def account(dataset: object) -> pd.DataFrame:
+    views = live_views()
+    figures = [manager.canvas.figure for manager in Gcf.get_all_fig_managers()]  # noqa: E501
+    cache = dataset.get_cache().get_stats()
+    renders = dataset.get_render_cache().get_stats()
+
+    rows = dataset.get_memory_usage() + [
+        ('result cache', cache['entries'], cache['bytes']),
+        ('render cache', renders['entries'], renders['bytes']),
+        ('FuelData views', len(views), sum(view.get_view_bytes() for view in views)),  # noqa: E501
+        ('open figures', len(figures), object_bytes(*figures))
+    ]
+
+    report = pd.DataFrame(rows, columns=['component', 'items', 'bytes'])
+    report = report.set_index('component')
+    report.loc['Total'] = report.sum()
+    report.loc['process RSS'] = [np.nan, process_rss() or np.nan]
+
+    return report
+
+
+def enforce_budget(dataset: object,
+                   budget: int | None = MEMORY_BUDGET_BYTES) -> bool:
+    if budget is None:
+        return False
+
+    # The budget bounds the accounted bytes; the RSS also holds allocator
+    # slack and libraries, so it is only reported.
+    report = account(dataset)
+    excess = report.loc['Total', 'bytes'] - budget
+
+    if excess <= 0:
+        return False
+
+    logger.warning(
+        'Memory budget exceeded: %d of %d bytes accounted; trimming caches.\n%s',  # noqa: E501
+        report.loc['Total', 'bytes'], budget, report.to_string()
+    )
+
+    # Cheapest to rebuild first: encoded charts and then the filter results,
+    # each trimmed from its least recently used entries only as far as the
+    # excess requires.
+    for cache in [dataset.get_render_cache(), dataset.get_cache()]:
+        held = cache.get_stats()['bytes']
+        cache.trim(max(held - excess, 0))
+        excess -= held - cache.get_stats()['bytes']
+
+    # The copied views of the sessions go last, the largest first, and only
+    # while the caches did not cover the excess.
+    for view in sorted(live_views(), key=lambda view: view.get_view_bytes(),
+                       reverse=True):
+        if excess <= 0:
+            break
+
+        held = view.get_view_bytes()
+        view.release_view()
+        excess -= held - view.get_view_bytes()
+
+    return True
@@ -0,0 +1,145 @@
+import argparse
+import contextvars
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pandas as pd
+
+from settings import PROFILE_LOG
+
+# Records of the rerun running in the current thread, None when off.
+_records = contextvars.ContextVar('profiling_records', default=None)
+_depth = contextvars.ContextVar('profiling_depth', default=0)
+_log_lock = threading.Lock()
+
+
+def start_run() -> list:
+    records = []
+    _records.set(records)
+    _depth.set(0)
+    return records
+
+
+def stop_run() -> None:
+    _records.set(None)
+
+
+def count_rows(value: object) -> int | None:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.shape[0]
+
+    shape = getattr(value, 'shape', None)
+
+    return shape[0] if shape else None
+
+
+def quiet(function: Callable, *args) -> object:
+    # Runs function without recording the calls it makes.
+    token = _records.set(None)
+
+    try:
+        return function(*args)
+    finally:
+        _records.reset(token)
+
+
+@contextmanager
+def timer(operation: str,
+          rows_in: int | None = None) -> Iterator[dict]:
+    records = _records.get()
+
+    if records is None:
+        yield {}
+        return
+
+    record = {'operation': operation, 'depth': _depth.get(), 'rows_in': rows_in}  # noqa: E501
+    records.append(record)
+    token = _depth.set(record['depth'] + 1)
+    start = time.perf_counter()
+
+    try:
+        yield record
+    finally:
+        record['ms'] = (time.perf_counter() - start) * 1000
+        _depth.reset(token)
+
+
+def profile_methods(rows: Callable) -> Callable:
+    # Wraps every public method of the class; rows(self) gives the rows
+    # the instance sees before and after the call.
+    def decorate(cls: type) -> type:
+        for name, method in list(vars(cls).items()):
+            if name.startswith('_') or not callable(method):
+                continue
+
+            setattr(cls, name, profiled(f'{cls.__name__}.{name}', rows)(method))  # noqa: E501
+
+        return cls
+
+    return decorate
+
+
+def profiled(operation: str, rows: Callable) -> Callable:
+    def decorate(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if _records.get() is None:
+                return method(self, *args, **kwargs)
+
+            with timer(operation, quiet(rows, self)) as record:
+                result = method(self, *args, **kwargs)
+                record['rows_out'] = count_rows(result)
+
+                if record['rows_out'] is None:
+                    record['rows_out'] = quiet(rows, self)
+
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def write_records(records: list,
+                  session: str,
+                  path: Path = Path(PROFILE_LOG)) -> None:
+    created = datetime.now().isoformat(timespec='milliseconds')
+    lines = [
+        json.dumps({'created': created, 'session': session, **record},
+                   ensure_ascii=False)
+        for record in records
+    ]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with _log_lock, open(path, 'a', encoding='utf-8') as target:
+        target.write(''.join(f'{line}\n' for line in lines))
+
+
+def summarize(path: Path = Path(PROFILE_LOG)) -> pd.DataFrame:
+    records = pd.read_json(path, lines=True)
+    grouped = records.groupby('operation')['ms']
+
+    summary = pd.DataFrame({
+        'count': grouped.size(),
+        'p50_ms': grouped.quantile(0.50),
+        'p95_ms': grouped.quantile(0.95),
+        'max_ms': grouped.max()
+    })
+
+    return summary.sort_values('p95_ms', ascending=False).round(3)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Latency percentiles per operation of the timing log.')
+    parser.add_argument('path', nargs='?', type=Path, default=Path(PROFILE_LOG))  # noqa: E501
+    args = parser.parse_args()
+
+    print(summarize(args.path).to_string())
@@ -0,0 +1,128 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from settings import RESULT_CACHE_MAX_BYTES
+
+# Keys of the set_fuel filter dictionary, in canonical order.
+FILTER_KEYS = ['cities', 'flags', 'fuels', 'period', 'regions', 'resales', 'states']  # noqa: E501
+
+
+def filter_spec(sets: dict) -> tuple:
+    spec = []
+
+    for key in FILTER_KEYS:
+        value = sets.get(key)
+
+        if key == 'period':
+            if value is not None and value != ():
+                value = (pd.Timestamp(value[0]), pd.Timestamp(value[1]))
+            else:
+                value = None
+        elif isinstance(value, str):
+            value = None if value == 'Todos' else (value,)
+        elif value is not None:
+            value = tuple(sorted({str(item) for item in value}))
+            value = None if value in [(), ('Todos',)] else value
+
+        spec.append((key, value))
+
+    return tuple(spec)
+
+
+def sizeof(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(sys.getsizeof(item) for item in value)
+
+        return value.nbytes
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value.values())  # noqa: E501
+
+    return sys.getsizeof(value)
+
+
+class ResultCache():
+
+    # Constructor
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES) -> None:
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__lock = threading.Lock()
+
+    # private methods
+    def __evict(self, max_bytes: int) -> None:
+        while self.__bytes > max_bytes and len(self.__entries) > 0:
+            _, (_, size) = self.__entries.popitem(last=False)
+            self.__bytes -= size
+            self.__evictions += 1
+
+    # Getters
+    def get_or_compute(self, key: Hashable, compute: Callable) -> Any:
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return self.__entries[key][0]
+
+            self.__misses += 1
+
+        value = compute()
+        size = sizeof(value)
+
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+
+        with self.__lock:
+            if size <= self.__max_bytes and key not in self.__entries:
+                self.__entries[key] = (value, size)
+                self.__bytes += size
+                self.__evict(self.__max_bytes)
+
+        return value
+
+    def get_stats(self) -> dict:
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+
+            return {
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'hit_ratio': self.__hits / lookups if lookups > 0 else 0.0,
+                'evictions': self.__evictions,
+                'entries': len(self.__entries),
+                'bytes': self.__bytes,
+                'max_bytes': self.__max_bytes
+            }
+
+    # Setters
+    def set_max_bytes(self, max_bytes: int) -> None:
+        with self.__lock:
+            self.__max_bytes = max_bytes
+            self.__evict(max_bytes)
+
+    def trim(self, max_bytes: int) -> None:
+        # Evicts down to max_bytes, least recently used first, keeping the
+        # limit of later insertions.
+        with self.__lock:
+            self.__evict(max_bytes)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
@@ -1,13 +1,62 @@
-from datetime import datetime
+import os
 
 # Constantes
-DATE_START = datetime(2022, 7, 1)
+# Folder holding the ANP semester files (ca-2021-01.csv, ca-2021-02.csv, ...).
+DATA_DIR = 'base'
 
-DATE_END = datetime(2022, 7, 31)
+SOURCE_PATTERN = 'ca-*.csv'
 
-MIN_DATE = datetime(2022, 7, 1)
+# Length of the period selected by default, ending at the latest collection.
+DEFAULT_PERIOD_DAYS = 30
 
-MAX_DATE = datetime(2022, 12, 31)
+# Rows per chunk when streaming the ANP file; None reads it at once.
+CSV_CHUNK_SIZE = 250_000
+
+# Memory budget of the filter result cache shared by every session.
+RESULT_CACHE_MAX_BYTES = 128 * 1024 ** 2
+
+# Rows shown per page of the spreadsheet tab.
+PAGE_SIZE = 50
+
+# Rows converted at a time when exporting the filtered data.
+EXPORT_CHUNK_ROWS = 100_000
+
+# Timing of every FuelData / FuelController call, shown in the sidebar and
+# appended as JSON lines to PROFILE_LOG; off unless FUEL_PROFILING is set.
+PROFILING = os.environ.get('FUEL_PROFILING', '').lower() in ['1', 'true', 'yes']  # noqa: E501
+PROFILE_LOG = os.environ.get('FUEL_PROFILE_LOG', '.cache/profile.jsonl')
+
+# Accounted memory above which the caches are trimmed and a warning is
+# logged; off unless FUEL_MEMORY_BUDGET_MB is set.
+MEMORY_BUDGET_BYTES = int(os.environ.get('FUEL_MEMORY_BUDGET_MB', 0)) * 1024 ** 2 or None  # noqa: E501
+
+# Memory budget of the encoded chart images shared by every session.
+RENDER_CACHE_MAX_BYTES = 64 * 1024 ** 2
+
+# Resolution of the exported charts and of the preview sent first when
+# progressive charts are on; the full resolution is then sent on demand.
+CHART_DPI = 600
+PREVIEW_DPI = 96
+PROGRESSIVE_CHARTS = True
+
+# Processes drawing the per-region state charts side by side; None uses one
+# per CPU and 1 draws them in the request thread. FUEL_RENDER_WORKERS
+# overrides it.
+RENDER_WORKERS = int(os.environ.get('FUEL_RENDER_WORKERS', 0)) or None
+
+# Resolution of the charts written by the batch report.
+REPORT_DPI = 150
+
+# Charts are drawn as images on the server ('matplotlib') or in the browser
+# from the aggregated rows ('altair'); set per deployment.
+CHART_BACKEND = os.environ.get('FUEL_CHART_BACKEND', 'matplotlib')
+
+# Storage of the survey rows: 'pandas' keeps them in memory, 'sqlite' in
+# an indexed database file next to the sources that every process shares.
+STORAGE_BACKEND = os.environ.get('FUEL_STORAGE_BACKEND', 'pandas')
+
+# Port of the local JSON API (fuel_api.py).
+API_PORT = 8502
 
 ABOUT_MSG = '''
 ## Projeto Integrador em Computação IV
@@ -0,0 +1,338 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (CACHE_DIR_NAME, CATEGORY_COLUMNS, PRICE_COLUMNS,
+                         SOURCE_COLUMNS, combine_hashes, current_key,
+                         iter_chunks, source_files)
+from fuel_backend import FuelBackend
+from fuel_cube import CUBE_DIMENSIONS, MEASURES
+from fuel_index import DIMENSIONS
+from fuel_labels import FuelLabels
+from memory_accounting import object_bytes
+from result_cache import filter_spec
+from settings import (CSV_CHUNK_SIZE, RENDER_CACHE_MAX_BYTES,
+                      RESULT_CACHE_MAX_BYTES)
+
+logger = logging.getLogger(__name__)
+
+# Columns indexed together with the collection date, so that a period and
+# one of them are answered by a single index.
+INDEXED_COLUMNS = [
+    'Regiao - Sigla',
+    'Estado - Sigla',
+    'Municipio',
+    'Revenda',
+    'Produto',
+    'Bandeira'
+]
+
+DATE = '"Data da Coleta"'
+SALE = '"Valor de Venda"'
+
+
+def quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def database_path(source: Path) -> Path:
+    source = Path(source)
+
+    if source.is_dir():
+        return source / CACHE_DIR_NAME / 'fuel.sqlite3'
+
+    return source.parent / CACHE_DIR_NAME / f'{source.stem}.sqlite3'
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f'{Path(path).resolve().as_uri()}?mode=ro',
+                           uri=True,
+                           check_same_thread=False)
+
+
+def read_meta(path: Path) -> dict:
+    try:
+        with closing(connect(path)) as connection:
+            return dict(connection.execute('SELECT key, value FROM meta'))
+    except sqlite3.Error:
+        return {}
+
+
+def write_meta(path: Path, key: str, value: str) -> None:
+    try:
+        with closing(sqlite3.connect(path)) as connection:
+            connection.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                               [key, value])
+            connection.commit()
+    except sqlite3.Error as e:
+        logger.warning("Could not update the SQLite database '%s': %s",
+                       path, e)
+
+
+def source_keys(source: Path, stored: dict) -> dict:
+    # The source_key of every file by name. As for the Parquet cache, a
+    # file is only hashed when its size or mtime differ from the stored key.
+    files = source_files(source) if Path(source).is_dir() else [Path(source)]
+    keys = json.loads(stored.get('files', '{}'))
+
+    return {file.name: current_key(file, keys.get(file.name))
+            for file in files}
+
+
+def chunk_records(chunk: pd.DataFrame) -> Iterator[tuple]:
+    data = chunk[SOURCE_COLUMNS].astype(object)
+    data['Data da Coleta'] = chunk['Data da Coleta'].dt.strftime('%Y-%m-%d')
+    data = data.where(data.notna(), None)
+    return data.itertuples(index=False, name=None)
+
+
+def build_database(source: Path,
+                   path: Path,
+                   version: str,
+                   keys: dict,
+                   chunksize: int | None = CSV_CHUNK_SIZE) -> None:
+    files = source_files(source) if Path(source).is_dir() else [Path(source)]
+    temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+    columns = ', '.join(
+        f"{quote(column)} {'REAL' if column in PRICE_COLUMNS else 'TEXT'}"
+        for column in SOURCE_COLUMNS
+    )
+    values = ', '.join('?' * len(SOURCE_COLUMNS))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary.unlink(missing_ok=True)
+
+    # The chunks are cleaned as for the pandas frame and written one at a
+    # time, so the whole survey is never held in memory.
+    with closing(sqlite3.connect(temporary)) as connection:
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.execute(f'CREATE TEMP TABLE staging ({columns})')
+
+        for file in files:
+            for chunk in iter_chunks(file, chunksize):
+                connection.executemany(f'INSERT INTO staging VALUES ({values})',  # noqa: E501
+                                       chunk_records(chunk))
+
+        # Rows are stored in collection date order, missing dates last and
+        # ties in file order, so rowid - 1 is the position of the row in the
+        # pandas frame.
+        connection.execute(f'CREATE TABLE fuel ({columns})')
+        connection.execute('INSERT INTO fuel SELECT * FROM staging'
+                           f' ORDER BY {DATE} IS NULL, {DATE}, rowid')
+        connection.execute('DROP TABLE staging')
+
+        for number, column in enumerate(INDEXED_COLUMNS):
+            connection.execute(
+                f'CREATE INDEX fuel_{number} ON fuel ({quote(column)}, {DATE})')  # noqa: E501
+
+        connection.execute(f'CREATE INDEX fuel_date ON fuel ({DATE})')
+        connection.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')  # noqa: E501
+        connection.execute("INSERT INTO meta VALUES ('version', ?), ('files', ?)",  # noqa: E501
+                           [version, json.dumps(keys)])
+        connection.execute('ANALYZE')
+        connection.commit()
+
+    os.replace(temporary, path)
+    logger.info("Built the SQLite database '%s'.", path)
+
+
+class SQLiteDataset(FuelBackend):
+
+    # Constructor
+    def __init__(self,
+                 source: Path,
+                 rebuild_cache: bool = False,
+                 chunksize: int | None = CSV_CHUNK_SIZE,
+                 cache_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 render_bytes: int = RENDER_CACHE_MAX_BYTES) -> None:
+        self.__path = database_path(source)
+        stored = read_meta(self.__path)
+        keys = source_keys(source, stored)
+        version = combine_hashes([key['hash'] for key in keys.values()])
+
+        if rebuild_cache or stored.get('version') != version:
+            build_database(source, self.__path, version, keys, chunksize)
+        elif keys != json.loads(stored.get('files', '{}')):
+            # Touched or copied files keep the database; their new size and
+            # mtime are stored so they are not hashed again.
+            write_meta(self.__path, 'files', json.dumps(keys))
+
+        # The database is only read; every thread has its own connection.
+        self.__local = threading.local()
+
+        self.__categories = {
+            column: pd.Index(self.__column_values('fuel', column),
+                             dtype=object)
+            for column in CATEGORY_COLUMNS
+        }
+
+        size, min_date, max_date = self.__query(
+            f'SELECT COUNT(*), MIN({DATE}), MAX({DATE}) FROM fuel')[0]
+        self.__size = size
+
+        super().__init__(
+            pd.Timestamp(min_date).to_pydatetime(),
+            pd.Timestamp(max_date).to_pydatetime(),
+            FuelLabels(self.__categories),
+            version,
+            cache_bytes,
+            render_bytes
+        )
+
+        # Measured once, as the categories and labels never change.
+        self.__static_bytes = object_bytes(self.__categories,
+                                           self.get_labels())
+
+    # private methods
+    def __query(self, sql: str, params: list = []) -> list[tuple]:
+        connection = getattr(self.__local, 'connection', None)
+
+        if connection is None:
+            connection = connect(self.__path)
+            self.__local.connection = connection
+
+        return connection.execute(sql, params).fetchall()
+
+    def __column_values(self,
+                        source: str,
+                        column: str,
+                        where: str = '',
+                        params: list = []) -> list:
+        name = f'fuel.{quote(column)}'
+        where = f'{where} AND' if where else ' WHERE'
+        sql = (f'SELECT DISTINCT {name} FROM {source}{where} {name} IS NOT NULL'  # noqa: E501
+               f' ORDER BY {name}')
+
+        return [value for value, in self.__query(sql, params)]
+
+    def __where(self, sets: dict) -> tuple[str, list]:
+        clauses = []
+        params = []
+
+        for key, value in filter_spec(sets):
+            if value is None:
+                continue
+
+            if key == 'period':
+                # Dates are whole days, as the pandas frame compares them.
+                clauses.append(f'{DATE} BETWEEN ? AND ?')
+                params += [value[0].ceil('D').strftime('%Y-%m-%d'),
+                           value[1].floor('D').strftime('%Y-%m-%d')]
+            else:
+                clauses.append(f"{quote(DIMENSIONS[key])} IN ({', '.join('?' * len(value))})")  # noqa: E501
+                params += list(value)
+
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def __picked(self, rows: np.ndarray | None) -> tuple[str, str, list, str]:
+        # Source, filter, parameters and order of the given row positions.
+        if rows is None:
+            return 'fuel', '', [], 'fuel.rowid'
+
+        rows = np.asarray(rows, dtype=np.int64)
+
+        if len(rows) > 0 and np.array_equal(rows, np.arange(rows[0], rows[0] + len(rows))):  # noqa: E501
+            return ('fuel', ' WHERE fuel.rowid BETWEEN ? AND ?',
+                    [int(rows[0]) + 1, int(rows[-1]) + 1], 'fuel.rowid')
+
+        return ('json_each(?) AS picked JOIN fuel ON fuel.rowid = picked.value',  # noqa: E501
+                '', [json.dumps((rows + 1).tolist())], 'picked.key')
+
+    def __frame(self,
+                records: list[tuple],
+                columns: list,
+                index: np.ndarray | None = None) -> pd.DataFrame:
+        data = pd.DataFrame.from_records(records, columns=columns)
+
+        # Same dtypes as the pandas frame and cube.
+        for column in columns:
+            if column in self.__categories:
+                data[column] = pd.Categorical(data[column],
+                                              categories=self.__categories[column])  # noqa: E501
+            elif column == 'Data da Coleta':
+                data[column] = pd.to_datetime(data[column], format='%Y-%m-%d')
+            elif column in PRICE_COLUMNS:
+                data[column] = data[column].astype('float32')
+            elif column == 'count':
+                data[column] = data[column].astype('int64')
+            else:
+                data[column] = data[column].astype('float64')
+
+        if index is not None:
+            data.index = index
+
+        return data
+
+    # Getters
+    def get_amount_records(self) -> int:
+        return self.__size
+
+    def get_columns(self) -> list[str]:
+        return list(SOURCE_COLUMNS)
+
+    def get_rows(self, sets: dict) -> np.ndarray:
+        where, params = self.__where(sets)
+        records = self.__query(f'SELECT rowid - 1 FROM fuel{where} ORDER BY rowid', params)  # noqa: E501
+
+        return np.fromiter((row for row, in records), dtype=np.int64, count=len(records))  # noqa: E501
+
+    def take(self,
+             rows: np.ndarray | None,
+             columns: list | None = None) -> pd.DataFrame:
+        columns = columns if columns is not None else self.get_columns()
+        source, where, params, order = self.__picked(rows)
+        selected = ', '.join(f'fuel.{quote(column)}' for column in columns)
+        records = self.__query(f'SELECT {selected} FROM {source}{where} ORDER BY {order}', params)  # noqa: E501
+
+        return self.__frame(records,
+                            columns,
+                            np.arange(len(records)) if rows is None else rows)  # noqa: E501
+
+    def get_cells(self, sets: dict) -> pd.DataFrame:
+        where, params = self.__where(sets)
+        dimensions = ', '.join(quote(column) for column in CUBE_DIMENSIONS)
+        order = ', '.join(f'{quote(column)} IS NULL, {quote(column)}'
+                          for column in CUBE_DIMENSIONS)
+
+        # Only the cells of the cube leave the database.
+        records = self.__query(
+            f'SELECT {dimensions}, TOTAL({SALE}), COUNT({SALE}), MIN({SALE}),'
+            f' MAX({SALE}) FROM fuel{where} GROUP BY {dimensions} ORDER BY {order}',  # noqa: E501
+            params
+        )
+
+        return self.__frame(records, CUBE_DIMENSIONS + MEASURES)
+
+    def get_options(self, key: str, sets: dict) -> np.ndarray:
+        where, params = self.__where(sets)
+        values = self.__column_values('fuel', DIMENSIONS[key], where, params)
+
+        return np.array(values, dtype=object)
+
+    def get_values(self, key: str, rows: np.ndarray) -> np.ndarray:
+        source, where, params, _ = self.__picked(rows)
+        values = self.__column_values(source, DIMENSIONS[key], where, params)
+
+        return np.array(values, dtype=object)
+
+    def get_memory_usage(self) -> list[tuple[str, int, int]]:
+        # The rows stay on disk, outside the memory budget.
+        return [('categories and labels', 2, self.__static_bytes)]
+
+    def get_memory_report(self) -> pd.DataFrame:
+        # No column is held in memory: the report of data_loader has no rows
+        # but its Total.
+        report = pd.DataFrame({'object_bytes': [0], 'typed_bytes': [0]},
+                              index=['Total'])
+        report['ratio'] = np.nan
+
+        return report
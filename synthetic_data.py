@@ -0,0 +1,169 @@
+import argparse
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Column layout of the ANP semester files.
+ANP_COLUMNS = [
+    'Regiao - Sigla',
+    'Estado - Sigla',
+    'Municipio',
+    'Revenda',
+    'CNPJ da Revenda',
+    'Nome da Rua',
+    'Numero Rua',
+    'Complemento',
+    'Bairro',
+    'Cep',
+    'Produto',
+    'Data da Coleta',
+    'Valor de Venda',
+    'Valor de Compra',
+    'Unidade de Medida',
+    'Bandeira'
+]
+
+REGION_STATES = {
+    'N': ['AC', 'AM', 'AP', 'PA', 'RO', 'RR', 'TO'],
+    'NE': ['AL', 'BA', 'CE', 'MA', 'PB', 'PE', 'PI', 'RN', 'SE'],
+    'CO': ['DF', 'GO', 'MS', 'MT'],
+    'SE': ['ES', 'MG', 'RJ', 'SP'],
+    'S': ['PR', 'RS', 'SC']
+}
+
+# Mean sale price and its spread by product, in R$.
+PRODUCT_PRICES = {
+    'GASOLINA': (5.40, 0.45),
+    'GASOLINA ADITIVADA': (5.65, 0.45),
+    'ETANOL': (3.90, 0.50),
+    'DIESEL': (6.40, 0.40),
+    'DIESEL S10': (6.50, 0.40),
+    'GNV': (4.80, 0.50)
+}
+
+FLAGS = [
+    'BRANCA', 'VIBRA ENERGIA', 'IPIRANGA', 'RAIZEN', 'ALESAT', 'SABBA',
+    'CHARRUA', 'POTENCIAL', 'ATEM\' S', 'TAURUS', 'RODOIL', 'SIMARELLI',
+    'DISTRIBUIDORA EQUADOR', 'FEDERAL ENERGIA', 'TOTALENERGIES', 'STANG',
+    'RUFF C.J.', 'SP', 'ROYAL FIC', 'PETROX DISTRIBUIDORA'
+]
+
+# Share of the stations under each flag: unbranded and the three major
+# distributors hold most of them, as in the ANP surveys.
+FLAG_WEIGHTS = [0.42, 0.18, 0.16, 0.13] + [0.11 / (len(FLAGS) - 4)] * (len(FLAGS) - 4)  # noqa: E501
+
+SIZES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower().replace('_', '')
+
+    if value[-1] in SIZES:
+        return int(float(value[:-1]) * SIZES[value[-1]])
+
+    return int(value)
+
+
+def make_stations(rng: np.random.Generator,
+                  cities: int = 460,
+                  stations: int = 18_000) -> pd.DataFrame:
+    states = [(region, state) for region, items in REGION_STATES.items()
+              for state in items]
+
+    # The surveyed cities and their stations concentrate in a few states.
+    weights = rng.pareto(1.5, len(states)) + 1
+    weights = weights / weights.sum()
+    city_states = rng.choice(len(states), cities, p=weights)
+    city_names = [f'MUNICIPIO {states[code][1]} {number:03d}'
+                  for number, code in enumerate(city_states)]
+
+    city_weights = rng.pareto(1.2, cities) + 1
+    station_cities = rng.choice(cities, stations, p=city_weights / city_weights.sum())  # noqa: E501
+    numbers = np.arange(stations)
+
+    return pd.DataFrame({
+        'Regiao - Sigla': [states[city_states[c]][0] for c in station_cities],
+        'Estado - Sigla': [states[city_states[c]][1] for c in station_cities],
+        'Municipio': [city_names[c] for c in station_cities],
+        'Revenda': [f'POSTO {number:05d} LTDA' for number in numbers],
+        'CNPJ da Revenda': [
+            f'{number // 1000:02d}.{number % 1000:03d}.000/0001-{number % 97:02d}'  # noqa: E501
+            for number in numbers
+        ],
+        'Nome da Rua': [f'RUA {number % 500}' for number in numbers],
+        'Numero Rua': (numbers % 2000 + 1).astype(str),
+        'Complemento': '',
+        'Bairro': 'CENTRO',
+        'Cep': [f'{number % 99999:05d}-000' for number in numbers],
+        'Bandeira': rng.choice(FLAGS, stations, p=FLAG_WEIGHTS)
+    })
+
+
+def make_chunk(rng: np.random.Generator,
+               stations: pd.DataFrame,
+               rows: int,
+               start: date,
+               end: date) -> pd.DataFrame:
+    chunk = stations.iloc[rng.integers(0, len(stations), rows)]
+    chunk = chunk.reset_index(drop=True)
+
+    products = np.array(list(PRODUCT_PRICES))
+    chosen = rng.integers(0, len(products), rows)
+    means, spreads = np.array(list(PRODUCT_PRICES.values())).T
+    prices = rng.normal(means[chosen], spreads[chosen] / 2).round(2)
+
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    dates = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, rows), unit='D')  # noqa: E501
+
+    chunk['Produto'] = products[chosen]
+    chunk['Data da Coleta'] = dates.strftime('%d/%m/%Y')
+    chunk['Valor de Venda'] = prices
+    chunk['Valor de Compra'] = np.nan
+    chunk['Unidade de Medida'] = np.where(products[chosen] == 'GNV', 'R$ / m³', 'R$ / litro')  # noqa: E501
+
+    return chunk[ANP_COLUMNS]
+
+
+def generate(path: Path,
+             rows: int,
+             start: date = date(2022, 7, 1),
+             end: date = date(2022, 12, 31),
+             seed: int = 1,
+             chunk_size: int = 500_000) -> Path:
+    rng = np.random.default_rng(seed)
+    stations = make_stations(rng)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, 'w', encoding='utf-8', newline='') as target:
+        for offset in range(0, rows, chunk_size):
+            chunk = make_chunk(rng,
+                               stations,
+                               min(chunk_size, rows - offset),
+                               start,
+                               end)
+            chunk.to_csv(target,
+                         sep=';',
+                         decimal=',',
+                         index=False,
+                         header=offset == 0)
+
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Write a synthetic ANP fuel price survey CSV.')
+    parser.add_argument('rows', type=parse_size,
+                        help='number of rows, e.g. 100k, 1M or 10M')
+    parser.add_argument('output', type=Path, help='CSV file to write')
+    parser.add_argument('--start', type=date.fromisoformat,
+                        default=date(2022, 7, 1))
+    parser.add_argument('--end', type=date.fromisoformat,
+                        default=date(2022, 12, 31))
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    generate(args.output, args.rows, args.start, args.end, args.seed)
@@ -0,0 +1,73 @@
+from dataclasses import asdict
+
+import numpy as np
+import pytest
+
+from fuel_data import FuelData
+from fuel_dataset import FuelDataset
+from sqlite_dataset import SQLiteDataset
+
+
+@pytest.fixture(scope='module', params=[FuelDataset, SQLiteDataset])
+def dataset(request, survey, reference):
+    if request.param is FuelDataset:
+        return reference
+
+    return request.param(survey)
+
+
+@pytest.mark.parametrize('whole', [True, False])
+@pytest.mark.parametrize('seed', range(40))
+@pytest.mark.parametrize('key', ['regions', 'states', 'cities', 'resales', 'fuels', 'flags'])  # noqa: E501
+def test_options_match_the_rows(dataset, reference, random_sets, seed, whole, key):  # noqa: E501
+    # Both backends offer, for the whole period or a narrower one, the
+    # values of the rows matching every filter.
+    sets = random_sets(seed, whole)
+    expected = reference.get_values(key, reference.get_rows(sets)).tolist()
+
+    assert dataset.covers_dataset(sets['period']) == whole
+    assert dataset.get_options(key, sets).tolist() == expected
+    assert dataset.get_values(key, dataset.get_rows(sets)).tolist() == expected
+
+
+@pytest.mark.parametrize('whole', [True, False])
+@pytest.mark.parametrize('seed', range(20))
+def test_filters_select_the_same_rows(dataset, reference, random_sets, seed, whole):  # noqa: E501
+    sets = random_sets(seed, whole)
+
+    assert np.array_equal(dataset.get_rows(sets), reference.get_rows(sets))
+
+
+@pytest.mark.parametrize('rows', [
+    None,
+    np.arange(100, 300),
+    np.array([5, 3, 9_000, 42, 0])
+])
+def test_take_returns_the_rows_in_order(dataset, reference, rows):
+    columns = ['Data da Coleta', 'Estado - Sigla', 'Produto', 'Valor de Venda']
+    data = dataset.take(rows, columns)
+    expected = reference.take(rows, columns)
+
+    assert data.columns.tolist() == columns
+    assert data.dtypes.tolist() == expected.dtypes.tolist()
+    assert data.reset_index(drop=True).equals(expected.reset_index(drop=True))
+
+
+@pytest.mark.parametrize('whole', [True, False])
+@pytest.mark.parametrize('seed', range(10))
+def test_metrics_match(dataset, reference, random_sets, seed, whole):
+    sets = random_sets(seed, whole)
+    view = FuelData(dataset=dataset)
+    expected = FuelData(dataset=reference)
+    view.set_fuel(dict(sets), inplace=True)
+    expected.set_fuel(dict(sets), inplace=True)
+
+    assert view.get_amount_records() == expected.get_amount_records()
+    assert asdict(view.get_metrics()) == asdict(expected.get_metrics())
+
+
+def test_memory_report(dataset, reference):
+    report = dataset.get_memory_report()
+
+    assert report.columns.tolist() == reference.get_memory_report().columns.tolist()  # noqa: E501
+    assert report.index[-1] == 'Total'
@@ -0,0 +1,172 @@
+import io
+import os
+import tempfile
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fuel_controller
+from fuel_controller import FuelController
+from fuel_data import FuelData
+from fuel_dataset import FuelDataset
+from sqlite_dataset import SQLiteDataset
+
+COLUMNS = ['Municipio', 'CNPJ da Revenda', 'Produto', 'Data da Coleta', 'Valor de Venda', 'Bandeira']  # noqa: E501
+
+
+@pytest.fixture(scope='module', params=[FuelDataset, SQLiteDataset])
+def view(request, survey) -> FuelData:
+    fdt = FuelData(dataset=request.param(survey))
+    min_date, max_date = fdt.get_date_bounds()
+    fdt.set_fuel({
+        'period': (min_date, max_date),
+        'regions': None,
+        'states': ['SP', 'RJ', 'PR'],
+        'cities': None,
+        'resales': None,
+        'fuels': ['ETANOL', 'GASOLINA'],
+        'flags': None
+    }, inplace=True)
+
+    return fdt
+
+
+def plain(data: pd.DataFrame) -> pd.DataFrame:
+    # Values only: categories as strings and prices as float64.
+    data = data.reset_index(drop=True)
+
+    for column in data.columns:
+        if isinstance(data[column].dtype, pd.CategoricalDtype):
+            data[column] = data[column].astype(str)
+        elif data[column].dtype.kind == 'f':
+            data[column] = data[column].astype(np.float64)
+
+    return data
+
+
+def expected(view: FuelData, columns: list) -> pd.DataFrame:
+    columns = columns or view.get_dataset().get_columns()
+    return plain(view.get_dataframe()[columns])
+
+
+@pytest.mark.parametrize('columns', [COLUMNS, []])
+@pytest.mark.parametrize('decimal', [',', '.'])
+def test_csv_round_trip(view, columns, decimal):
+    target = io.BytesIO()
+    size = view.export(target, 'csv', columns, decimal, chunk_size=1_000)
+    reference = expected(view, columns)
+
+    assert size == len(target.getvalue())
+    assert view.get_amount_records() > 1_000
+
+    data = pd.read_csv(io.BytesIO(target.getvalue()),
+                       sep=';',
+                       decimal=decimal,
+                       dtype={column: str for column in reference.columns
+                              if reference[column].dtype == object})
+    data['Data da Coleta'] = pd.to_datetime(data['Data da Coleta'],
+                                            format='%d/%m/%Y')
+
+    pd.testing.assert_frame_equal(plain(data), reference,
+                                  check_dtype=False, rtol=1e-6)
+
+
+@pytest.mark.parametrize('columns', [COLUMNS, []])
+def test_parquet_round_trip(view, columns):
+    target = io.BytesIO()
+    view.export(target, 'parquet', columns, chunk_size=1_000)
+    data = pd.read_parquet(io.BytesIO(target.getvalue()))
+
+    pd.testing.assert_frame_equal(plain(data), expected(view, columns))
+
+
+def test_chunks_join_into_the_whole_export(view):
+    whole = io.BytesIO()
+    view.export(whole, 'csv', COLUMNS, chunk_size=10 ** 6)
+
+    assert b''.join(view.iter_export('csv', COLUMNS, chunk_size=997)) == whole.getvalue()  # noqa: E501
+
+
+@pytest.mark.parametrize('format', ['csv', 'parquet'])
+def test_empty_view_exports_the_header(survey, format):
+    fdt = FuelData(dataset=FuelDataset(survey))
+    fdt.set_fuel({
+        'period': fdt.get_default_period(),
+        'regions': None,
+        'states': None,
+        'cities': ['Nenhuma'],
+        'resales': None,
+        'fuels': None,
+        'flags': None
+    }, inplace=True)
+
+    target = io.BytesIO()
+    fdt.export(target, format, COLUMNS)
+    target.seek(0)
+
+    if format == 'csv':
+        data = pd.read_csv(target, sep=';')
+    else:
+        data = pd.read_parquet(target)
+
+    assert data.columns.tolist() == COLUMNS
+    assert data.shape[0] == 0
+
+
+@pytest.mark.parametrize('arguments', [
+    {'format': 'xlsx'},
+    {'decimal': ';'},
+    {'chunk_size': 0},
+    {'columns': ['Preco']}
+])
+def test_invalid_arguments(view, arguments):
+    with pytest.raises(ValueError):
+        view.iter_export(**arguments)
+
+
+@pytest.fixture
+def streamlit(monkeypatch) -> dict:
+    # The widgets of export_button, with the button pressed.
+    calls = {'files': [], 'downloads': []}
+    named = tempfile.NamedTemporaryFile
+
+    def temporary(*args, **kwargs):
+        target = named(*args, **kwargs)
+        calls['files'].append(target.name)
+        return target
+
+    def download_button(label, data, **kwargs):
+        calls['downloads'].append(data.read())
+
+    st = fuel_controller.st
+    monkeypatch.setattr(fuel_controller.tempfile, 'NamedTemporaryFile', temporary)  # noqa: E501
+    monkeypatch.setattr(st, 'columns', lambda amount: [nullcontext()] * amount)  # noqa: E501
+    monkeypatch.setattr(st, 'selectbox', lambda label, options, **kwargs: options[-1])  # noqa: E501
+    monkeypatch.setattr(st, 'button', lambda label, **kwargs: True)
+    monkeypatch.setattr(st, 'download_button', download_button)
+
+    return calls
+
+
+def test_export_button_removes_the_file(view, streamlit):
+    FuelController(view).export_button(COLUMNS)
+
+    assert len(streamlit['files']) == 1
+    assert streamlit['downloads'][0][:4] == b'PAR1'
+    assert not os.path.exists(streamlit['files'][0])
+
+
+def test_failed_export_removes_the_file(view, streamlit, monkeypatch):
+    def export(*args, **kwargs):
+        raise MemoryError('export failed')
+
+    monkeypatch.setattr(view, 'export', export)
+
+    with pytest.raises(MemoryError):
+        FuelController(view).export_button(COLUMNS)
+
+    assert len(streamlit['files']) == 1
+    assert streamlit['downloads'] == []
+    assert not os.path.exists(streamlit['files'][0])
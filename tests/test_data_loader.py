@@ -0,0 +1,165 @@
+import os
+import shutil
+
+import pytest
+
+import data_loader
+from data_loader import (cache_path, load_dataframe, read_cache_key,
+                         source_version)
+
+
+@pytest.fixture
+def source(survey, tmp_path):
+    return shutil.copy(survey, tmp_path / survey.name)
+
+
+@pytest.fixture
+def calls(monkeypatch) -> dict:
+    # Files parsed from the CSV and files hashed, by name.
+    calls = {'parsed': [], 'hashed': []}
+    read_source = data_loader.read_source
+    content_hash = data_loader.content_hash
+
+    def parsed(path, *args):
+        calls['parsed'].append(path.name)
+        return read_source(path, *args)
+
+    def hashed(path):
+        calls['hashed'].append(path.name)
+        return content_hash(path)
+
+    monkeypatch.setattr(data_loader, 'read_source', parsed)
+    monkeypatch.setattr(data_loader, 'content_hash', hashed)
+    return calls
+
+
+def touch(path, seconds: int = 10) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))  # noqa: E501
+
+
+def load(source, calls) -> tuple:
+    for values in calls.values():
+        values.clear()
+
+    return load_dataframe(source), read_cache_key(source)
+
+
+def test_first_load_writes_the_cache(source, calls):
+    df, key = load(source, calls)
+    stat = os.stat(source)
+
+    assert calls['parsed'] == [source.name]
+    assert calls['hashed'] == [source.name]
+    assert cache_path(source).exists()
+    assert key == {
+        'version': data_loader.CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': data_loader.content_hash(source)
+    }
+
+
+def test_unchanged_source_reads_the_cache(source, calls):
+    df, key = load(source, calls)
+    cached, cached_key = load(source, calls)
+
+    assert calls == {'parsed': [], 'hashed': []}
+    assert cached_key == key
+    assert cached.equals(df)
+
+
+def test_touched_source_reuses_the_cache(source, calls):
+    df, key = load(source, calls)
+    touch(source)
+    cached, touched = load(source, calls)
+
+    # Same content: the cache is kept and its key follows the new mtime.
+    assert calls == {'parsed': [], 'hashed': [source.name]}
+    assert cached.equals(df)
+    assert touched['mtime_ns'] == os.stat(source).st_mtime_ns
+    assert touched['hash'] == key['hash']
+    assert touched['size'] == key['size']
+
+    load(source, calls)
+
+    assert calls == {'parsed': [], 'hashed': []}
+
+
+def test_copied_source_reuses_the_cache(source, calls, tmp_path):
+    df, key = load(source, calls)
+    copy = tmp_path / 'copy'
+    copy.mkdir()
+    shutil.copytree(cache_path(source).parent, copy / cache_path(source).parent.name)  # noqa: E501
+    shutil.copy(source, copy / source.name)
+    cached, _ = load(copy / source.name, calls)
+
+    assert calls['parsed'] == []
+    assert cached.equals(df)
+
+
+def test_changed_content_rebuilds(source, calls):
+    df, key = load(source, calls)
+
+    # Same size and a new mtime: only the hash tells them apart.
+    content = source.read_bytes()
+    position = content.rindex(b';ETANOL;')
+    source.write_bytes(content[:position] + b';ETANOX;' + content[position + 8:])  # noqa: E501
+    touch(source)
+    rebuilt, changed = load(source, calls)
+
+    assert changed['size'] == key['size']
+    assert changed['hash'] != key['hash']
+    assert calls['parsed'] == [source.name]
+    assert rebuilt.shape[0] == df.shape[0] - 1
+
+
+def test_changed_size_rebuilds(source, calls):
+    df, key = load(source, calls)
+    lines = source.read_text(encoding='utf-8').splitlines()
+
+    with open(source, 'a', encoding='utf-8') as file:
+        file.write(next(line for line in lines if ';ETANOL;' in line) + '\n')
+
+    rebuilt, changed = load(source, calls)
+
+    assert calls['parsed'] == [source.name]
+    assert changed['size'] > key['size']
+    assert rebuilt.shape[0] == df.shape[0] + 1
+
+
+def test_cache_version_bump_rebuilds(source, calls, monkeypatch):
+    df, key = load(source, calls)
+    monkeypatch.setattr(data_loader, 'CACHE_VERSION', key['version'] + 1)
+    rebuilt, bumped = load(source, calls)
+
+    assert calls['parsed'] == [source.name]
+    assert bumped['version'] == key['version'] + 1
+    assert bumped['hash'] == key['hash']
+    assert rebuilt.equals(df)
+
+
+def test_source_version_follows_the_cache_version(source, calls, monkeypatch):  # noqa: E501
+    load(source, calls)
+    version = source_version(source)
+    monkeypatch.setattr(data_loader, 'CACHE_VERSION', data_loader.CACHE_VERSION + 1)  # noqa: E501
+
+    assert source_version(source) != version
+
+
+def test_rebuild_ignores_the_cache(source, calls):
+    load(source, calls)
+    calls['parsed'].clear()
+    load_dataframe(source, rebuild=True)
+
+    assert calls['parsed'] == [source.name]
+
+
+def test_unreadable_cache_rebuilds(source, calls):
+    df, key = load(source, calls)
+    cache_path(source).write_bytes(b'not a parquet file')
+    rebuilt, rewritten = load(source, calls)
+
+    assert calls['parsed'] == [source.name]
+    assert rewritten == key
+    assert rebuilt.equals(df)
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+from tornado import testing
+
+from fuel_api import make_app
+from fuel_data import FuelData
+
+
+@pytest.fixture(scope='class')
+def api_dataset(request, reference):
+    request.cls.dataset = reference
+
+
+@pytest.mark.usefixtures('api_dataset')
+class TestFuelApi(testing.AsyncHTTPTestCase):
+
+    def runTest(self):
+        # pytest builds a dummy instance with this name, which tornado 6.3
+        # expects to exist.
+        pass
+
+    def get_app(self):
+        return make_app(self.dataset)
+
+    def get(self, path: str, **headers):
+        return self.fetch(path, headers=headers)
+
+    def get_json(self, path: str):
+        response = self.get(path)
+
+        assert response.code == 200, response.body
+        assert response.headers['Content-Type'].startswith('application/json')  # noqa: E501
+        return json.loads(response.body)
+
+    def test_metrics(self):
+        data = self.get_json('/api/metrics?regions=SE,S&fuels=GASOLINA')
+
+        assert data['records'] > 0
+        assert set(data['products']) <= {'GASOLINA', 'GASOLINA ADITIVADA', 'ETANOL'}  # noqa: E501
+
+        for measures in data['products'].values():
+            for value in measures.values():
+                assert value == round(value, 3)
+
+    def test_metrics_over_the_whole_period(self):
+        min_date, max_date = self.dataset.get_date_bounds()
+        whole = self.get_json(f'/api/metrics?start={min_date.date()}&end={max_date.date()}')  # noqa: E501
+        default = self.get_json('/api/metrics')
+
+        assert whole['records'] == self.dataset.get_amount_records()
+        assert default['records'] < whole['records']
+
+    def test_options(self):
+        regions = self.get_json('/api/options/regions')['regions']
+        states = self.get_json('/api/options/states?regions=SE')['states']
+
+        assert regions == FuelData(dataset=self.dataset).get_regions().tolist()  # noqa: E501
+        assert set(states) <= {'ES', 'MG', 'RJ', 'SP'}
+
+    def test_resales_options(self):
+        resales = self.get_json('/api/options/resales?states=SP')['resales']
+
+        assert resales
+        assert 'Todos' not in resales
+
+    def test_charts(self):
+        for kind in ['region', 'regions_and_states', 'cities', 'flags', 'evolution']:  # noqa: E501
+            data = self.get_json(f'/api/charts/{kind}?states=SP')
+
+            assert data['kind'] == kind
+            assert data['data']
+
+            for record in data['data']:
+                for value in record.values():
+                    if isinstance(value, float):
+                        assert value == round(value, 3)
+
+    def test_revalidation(self):
+        path = '/api/charts/region?fuels=ETANOL'
+        response = self.get(path)
+        etag = response.headers['Etag']
+
+        assert response.code == 200
+        assert self.get(path, **{'If-None-Match': etag}).code == 304
+        assert self.get('/api/charts/region?fuels=GASOLINA', **{'If-None-Match': etag}).code == 200  # noqa: E501
+
+    def test_equal_filters_share_the_etag(self):
+        first = self.get('/api/metrics?regions=S,SE')
+        second = self.get('/api/metrics?regions=SE&regions=S')
+
+        assert first.headers['Etag'] == second.headers['Etag']
+
+    def test_bad_period(self):
+        for query in ['start=2022-13-01', 'end=yesterday']:
+            response = self.get(f'/api/metrics?{query}')
+
+            assert response.code == 400
+            assert 'error' in json.loads(response.body)
+
+    def test_bad_filters(self):
+        assert self.get('/api/charts/pie?regions=SE').code == 400
+        assert self.get('/api/charts/region?start=july').code == 400
+        assert self.get('/api/options/products').code == 404
@@ -0,0 +1,173 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fuel_data import FuelData
+from fuel_dataset import FuelDataset
+from sqlite_dataset import SQLiteDataset
+
+COLUMNS = ['Estado - Sigla', 'Produto', 'Data da Coleta', 'Valor de Venda', 'Bandeira']  # noqa: E501
+
+
+@pytest.fixture(scope='module')
+def gaps(survey, tmp_path_factory) -> Path:
+    # The survey with some prices and flags left blank, so the sorted
+    # columns carry missing values.
+    lines = survey.read_text(encoding='utf-8').splitlines()
+    header = lines[0].split(';')
+    price, flag = header.index('Valor de Venda'), header.index('Bandeira')
+
+    for number in range(1, len(lines)):
+        fields = lines[number].split(';')
+
+        if number % 7 == 0:
+            fields[price] = ''
+
+        if number % 11 == 0:
+            fields[flag] = ''
+
+        lines[number] = ';'.join(fields)
+
+    path = tmp_path_factory.mktemp('gaps') / survey.name
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+
+@pytest.fixture(scope='module', params=[FuelDataset, SQLiteDataset])
+def dataset(request, gaps):
+    return request.param(gaps)
+
+
+@pytest.fixture
+def view(dataset) -> FuelData:
+    # A new view each time, so the sort column is read from the dataset
+    # unless the test copies the rows first.
+    fdt = FuelData(dataset=dataset)
+    min_date, max_date = fdt.get_date_bounds()
+    fdt.set_fuel({
+        'period': (min_date, max_date),
+        'regions': ['SE', 'S'],
+        'states': None,
+        'cities': None,
+        'resales': None,
+        'fuels': None,
+        'flags': None
+    }, inplace=True)
+
+    return fdt
+
+
+def records(page: pd.DataFrame) -> pd.DataFrame:
+    page = page.reset_index(drop=True)
+
+    for column in page.select_dtypes('category').columns:
+        page[column] = page[column].astype(object)
+
+    return page
+
+
+def all_pages(view: FuelData, page_size: int, **kwargs) -> pd.DataFrame:
+    pages = []
+    total = view.get_amount_records()
+
+    for number in range(1, total // page_size + 2):
+        page, _ = view.get_page(COLUMNS, number, page_size, **kwargs)
+        pages.append(records(page))
+
+    return pd.concat(pages, ignore_index=True)
+
+
+def test_missing_values_are_present(view):
+    data = view.get_dataframe()
+
+    assert data['Valor de Venda'].isna().any()
+    assert data['Bandeira'].isna().any()
+
+
+def test_page_bounds(view):
+    data = records(view.get_dataframe()[COLUMNS])
+    page, total = view.get_page(COLUMNS, 3, 100)
+
+    assert total == view.get_amount_records() == data.shape[0]
+    assert page.columns.tolist() == COLUMNS
+    assert records(page).equals(data.iloc[200:300].reset_index(drop=True))
+
+
+def test_last_partial_page(view):
+    total = view.get_amount_records()
+    page_size = 150
+    last = total // page_size + 1
+    data = records(view.get_dataframe()[COLUMNS])
+
+    assert total % page_size != 0
+
+    page, _ = view.get_page(COLUMNS, last, page_size)
+
+    assert page.shape[0] == total % page_size
+    assert records(page).equals(data.iloc[(last - 1) * page_size:].reset_index(drop=True))  # noqa: E501
+
+
+def test_page_past_the_end_is_empty(view):
+    total = view.get_amount_records()
+    page, amount = view.get_page(COLUMNS, total + 1, 1)
+
+    assert amount == total
+    assert page.shape == (0, len(COLUMNS))
+    assert page.columns.tolist() == COLUMNS
+
+
+@pytest.mark.parametrize('page, page_size', [
+    (0, 10), (-1, 10), (1.5, 10), ('1', 10), (1, 0), (1, -5), (1, None)
+])
+def test_invalid_pages(view, page, page_size):
+    with pytest.raises(ValueError):
+        view.get_page(COLUMNS, page, page_size)
+
+
+def test_invalid_columns(view):
+    with pytest.raises(ValueError):
+        view.get_page(['Preco'])
+
+    with pytest.raises(ValueError):
+        view.get_page(COLUMNS, sort_by='Preco')
+
+
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('sort_by', ['Valor de Venda', 'Bandeira', 'Estado - Sigla', 'Data da Coleta'])  # noqa: E501
+def test_sort_puts_missing_values_last(view, sort_by, ascending):
+    # Ties keep the collection date order both ways.
+    pages = all_pages(view, 997, sort_by=sort_by, ascending=ascending)
+    data = view.get_dataframe()[COLUMNS]
+    expected = records(data.sort_values(sort_by,
+                                        ascending=ascending,
+                                        kind='stable',
+                                        na_position='last'))
+
+    assert pages.equals(expected)
+
+    missing = pages[sort_by].isna().to_numpy()
+    assert not np.any(missing[:-1] & ~missing[1:])
+
+
+def test_unsorted_pages_follow_the_date_order(view, monkeypatch):
+    dataset = view.get_dataset()
+    take = dataset.take
+    calls = []
+
+    def counted(rows, columns=None):
+        calls.append(columns)
+        return take(rows, columns)
+
+    monkeypatch.setattr(dataset, 'take', counted)
+    data = records(view.get_dataframe()[COLUMNS])
+    calls.clear()
+
+    for sort_by in [None, 'Data da Coleta']:
+        page, _ = view.get_page(COLUMNS, 2, 500, sort_by=sort_by)
+
+        assert records(page).equals(data.iloc[500:1000].reset_index(drop=True))  # noqa: E501
+
+    # The date order needs no sort column: only the pages were read.
+    assert calls == [COLUMNS, COLUMNS]
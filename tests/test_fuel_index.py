@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fuel_index import DIMENSIONS, FuelIndex
+
+
+@pytest.fixture(scope='module')
+def frame() -> pd.DataFrame:
+    # Sorted by date like the dataset, with repeated dates, categories that
+    # have no rows and missing values.
+    rng = np.random.default_rng(0)
+    size = 5_000
+    dates = np.sort(rng.integers(0, 120, size))
+    data = {'Data da Coleta': pd.Timestamp('2022-07-01') + pd.to_timedelta(dates, 'D')}  # noqa: E501
+
+    for key, column in DIMENSIONS.items():
+        values = [f'{key}-{number}' for number in range(int(rng.integers(2, 30)))]  # noqa: E501
+        codes = rng.integers(-1, len(values) + 2, size)
+        codes[codes >= len(values)] = -1
+        data[column] = pd.Categorical.from_codes(codes, values + ['unused'])
+
+    return pd.DataFrame(data)
+
+
+def random_sets(frame: pd.DataFrame, rng: np.random.Generator) -> dict:
+    dates = frame['Data da Coleta']
+    days = pd.date_range(dates.iloc[0] - pd.Timedelta(days=2),
+                         dates.iloc[-1] + pd.Timedelta(days=2))
+    start, end = np.sort(rng.choice(days, 2))
+    sets = {'period': (start, end)}
+
+    for key, column in DIMENSIONS.items():
+        if rng.random() < 0.5:
+            sets[key] = None
+            continue
+
+        values = frame[column].cat.categories.tolist() + ['missing']
+        sets[key] = rng.choice(values, int(rng.integers(1, 4))).tolist()
+
+    return sets
+
+
+def mask_rows(frame: pd.DataFrame, sets: dict) -> np.ndarray:
+    mask = np.ones(frame.shape[0], dtype=bool)
+
+    if sets.get('period') is not None:
+        start, end = (pd.Timestamp(date) for date in sets['period'])
+        mask &= ((frame['Data da Coleta'] >= start)
+                 & (frame['Data da Coleta'] <= end)).to_numpy()
+
+    for key, column in DIMENSIONS.items():
+        values = sets.get(key)
+
+        if values is None:
+            continue
+
+        if isinstance(values, str):
+            values = [values]
+
+        mask &= frame[column].isin(values).to_numpy()
+
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_rows_match_a_boolean_mask(frame, seed):
+    sets = random_sets(frame, np.random.default_rng(seed))
+    rows = FuelIndex(frame).get_rows(sets)
+
+    assert np.array_equal(rows, mask_rows(frame, sets))
+
+
+@pytest.mark.parametrize('sets', [
+    {'regions': []},
+    {'regions': ['missing']},
+    {'states': ['unused']},
+    {'regions': ['regions-0'], 'states': ['missing']},
+    {'period': ('2021-01-01', '2021-12-31')},
+    {'period': ('2023-01-01', '2023-12-31')},
+    {'period': ('2022-08-01', '2022-07-01')}
+])
+def test_empty_selections(frame, sets):
+    rows = FuelIndex(frame).get_rows(sets)
+
+    assert rows.shape == (0,)
+    assert np.array_equal(rows, mask_rows(frame, sets))
+
+
+def test_periods_that_hit_the_first_and_last_rows(frame):
+    index = FuelIndex(frame)
+    dates = frame['Data da Coleta']
+    first, last = dates.iloc[0], dates.iloc[-1]
+
+    for period in [(first, first), (last, last), (first, last),
+                   (first - pd.Timedelta(days=1), first),
+                   (last, last + pd.Timedelta(days=1))]:
+        sets = {'period': period, 'fuels': frame['Produto'].cat.categories[:2].tolist()}  # noqa: E501
+        rows = index.get_rows({'period': period})
+
+        assert np.array_equal(rows, mask_rows(frame, {'period': period}))
+        assert np.array_equal(index.get_rows(sets), mask_rows(frame, sets))
+
+    assert index.get_rows({'period': (first, first)})[0] == 0
+    assert index.get_rows({'period': (last, last)})[-1] == frame.shape[0] - 1
+    assert np.array_equal(index.get_rows({'period': None}), np.arange(frame.shape[0]))  # noqa: E501
+
+
+def test_single_string_values(frame):
+    sets = {'fuels': frame['Produto'].cat.categories[0]}
+
+    assert np.array_equal(FuelIndex(frame).get_rows(sets), mask_rows(frame, sets))  # noqa: E501
@@ -0,0 +1,180 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from result_cache import FILTER_KEYS, ResultCache, filter_spec, sizeof
+
+
+def block(value: int) -> np.ndarray:
+    # 800 bytes each, so the budgets below count whole entries.
+    return np.full(100, value, dtype=np.int64)
+
+
+def test_filter_spec_lists_every_key_in_order():
+    assert [key for key, _ in filter_spec({})] == FILTER_KEYS
+    assert dict(filter_spec({})) == dict.fromkeys(FILTER_KEYS)
+
+
+@pytest.mark.parametrize('value', [None, [], (), ['Todos'], 'Todos'])
+def test_filter_spec_treats_every_empty_selection_alike(value):
+    assert filter_spec({'states': value}) == filter_spec({})
+
+
+def test_filter_spec_ignores_order_and_container():
+    spec = filter_spec({'states': ['SP', 'RJ', 'MG']})
+
+    assert dict(spec)['states'] == ('MG', 'RJ', 'SP')
+    assert filter_spec({'states': ('RJ', 'MG', 'SP')}) == spec
+    assert filter_spec({'states': {'SP', 'MG', 'RJ'}}) == spec
+    assert filter_spec({'states': np.array(['MG', 'SP', 'RJ'])}) == spec
+    assert filter_spec({'states': pd.Series(['SP', 'MG', 'RJ', 'SP'])}) == spec  # noqa: E501
+
+
+def test_filter_spec_keeps_a_single_string():
+    assert dict(filter_spec({'fuels': 'ETANOL'}))['fuels'] == ('ETANOL',)
+    assert filter_spec({'fuels': 'ETANOL'}) == filter_spec({'fuels': ['ETANOL']})  # noqa: E501
+
+
+def test_filter_spec_normalizes_the_period():
+    expected = filter_spec({'period': (datetime(2022, 7, 1), datetime(2022, 9, 30))})  # noqa: E501
+
+    assert filter_spec({'period': (date(2022, 7, 1), date(2022, 9, 30))}) == expected  # noqa: E501
+    assert filter_spec({'period': ['2022-07-01', '2022-09-30']}) == expected
+    assert filter_spec({'period': ()}) == filter_spec({'period': None})
+    assert filter_spec({'period': (date(2022, 7, 1), date(2022, 9, 29))}) != expected  # noqa: E501
+
+
+def test_get_or_compute_counts_hits_and_misses():
+    cache = ResultCache(10_000)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return block(1)
+
+    first = cache.get_or_compute('a', compute)
+    second = cache.get_or_compute('a', compute)
+    cache.get_or_compute('b', lambda: block(2))
+
+    assert second is first
+    assert len(calls) == 1
+    assert not first.flags.writeable
+
+    stats = cache.get_stats()
+
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['hit_ratio'] == pytest.approx(1 / 3)
+    assert stats['entries'] == 2
+    assert stats['bytes'] == 2 * sizeof(block(0))
+    assert stats['evictions'] == 0
+
+
+def test_empty_cache_stats():
+    assert ResultCache(100).get_stats() == {
+        'hits': 0,
+        'misses': 0,
+        'hit_ratio': 0.0,
+        'evictions': 0,
+        'entries': 0,
+        'bytes': 0,
+        'max_bytes': 100
+    }
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = ResultCache(3 * sizeof(block(0)))
+
+    for key in 'abc':
+        cache.get_or_compute(key, lambda: block(0))
+
+    # Reading 'a' makes 'b' the oldest entry.
+    cache.get_or_compute('a', lambda: block(0))
+    cache.get_or_compute('d', lambda: block(0))
+
+    stats = cache.get_stats()
+
+    assert stats['entries'] == 3
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+
+    misses = stats['misses']
+    cache.get_or_compute('a', lambda: block(0))
+    cache.get_or_compute('c', lambda: block(0))
+    cache.get_or_compute('d', lambda: block(0))
+
+    assert cache.get_stats()['misses'] == misses
+
+    cache.get_or_compute('b', lambda: block(0))
+
+    assert cache.get_stats()['misses'] == misses + 1
+
+
+def test_value_over_the_budget_is_not_stored():
+    cache = ResultCache(sizeof(block(0)) - 1)
+    value = cache.get_or_compute('a', lambda: block(1))
+
+    assert value.tolist() == block(1).tolist()
+    assert cache.get_stats()['entries'] == 0
+    assert cache.get_stats()['bytes'] == 0
+
+
+def test_trim_keeps_the_limit():
+    size = sizeof(block(0))
+    cache = ResultCache(4 * size)
+
+    for key in 'abcd':
+        cache.get_or_compute(key, lambda: block(0))
+
+    cache.trim(size)
+
+    stats = cache.get_stats()
+
+    assert stats['entries'] == 1
+    assert stats['evictions'] == 3
+    assert stats['max_bytes'] == 4 * size
+
+    # Only the newest entry is left, and the cache fills up again.
+    cache.get_or_compute('d', lambda: block(0))
+
+    assert cache.get_stats()['hits'] == 1
+
+    for key in 'efg':
+        cache.get_or_compute(key, lambda: block(0))
+
+    assert cache.get_stats()['entries'] == 4
+
+
+def test_set_max_bytes_evicts_down_to_the_new_limit():
+    size = sizeof(block(0))
+    cache = ResultCache(4 * size)
+
+    for key in 'abcd':
+        cache.get_or_compute(key, lambda: block(0))
+
+    cache.set_max_bytes(2 * size)
+
+    stats = cache.get_stats()
+
+    assert stats['entries'] == 2
+    assert stats['max_bytes'] == 2 * size
+
+    cache.get_or_compute('e', lambda: block(0))
+
+    assert cache.get_stats()['entries'] == 2
+
+
+def test_clear_keeps_the_counters():
+    cache = ResultCache(10_000)
+    cache.get_or_compute('a', lambda: block(0))
+    cache.get_or_compute('a', lambda: block(0))
+    cache.clear()
+
+    stats = cache.get_stats()
+
+    assert stats['entries'] == 0
+    assert stats['bytes'] == 0
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
@@ -0,0 +1,66 @@
+import os
+import shutil
+
+import pytest
+
+import data_loader
+from sqlite_dataset import SQLiteDataset, database_path
+
+
+@pytest.fixture
+def source(survey, tmp_path):
+    return shutil.copy(survey, tmp_path / survey.name)
+
+
+@pytest.fixture
+def hashed(monkeypatch) -> list:
+    files = []
+    content_hash = data_loader.content_hash
+
+    def counted(path):
+        files.append(path.name)
+        return content_hash(path)
+
+    monkeypatch.setattr(data_loader, 'content_hash', counted)
+    return files
+
+
+def test_reopening_does_not_hash_the_sources(source, hashed):
+    version = SQLiteDataset(source).get_version()
+    built = database_path(source).stat().st_mtime_ns
+    hashed.clear()
+
+    assert SQLiteDataset(source).get_version() == version
+    assert hashed == []
+    assert database_path(source).stat().st_mtime_ns == built
+
+
+def test_touched_source_is_hashed_once(source, hashed):
+    version = SQLiteDataset(source).get_version()
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    hashed.clear()
+
+    assert SQLiteDataset(source).get_version() == version
+    assert hashed == [source.name]
+
+    hashed.clear()
+    SQLiteDataset(source)
+
+    assert hashed == []
+
+
+def test_changed_source_rebuilds(source, hashed):
+    dataset = SQLiteDataset(source)
+    records = dataset.get_amount_records()
+
+    lines = source.read_text(encoding='utf-8').splitlines()
+    line = next(line for line in lines if ';ETANOL;' in line)
+
+    with open(source, 'a', encoding='utf-8') as file:
+        file.write(line + '\n')
+
+    changed = SQLiteDataset(source)
+
+    assert changed.get_version() != dataset.get_version()
+    assert changed.get_amount_records() == records + 1
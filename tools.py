@@ -1,3 +1,11 @@
+from typing import Any, Union
+
+import pandas as pd
+from typing_extensions import TypeAlias
+
+Value: TypeAlias = Union['pd.Series', float, None]
+
+
 def word_capitalize(word: str) -> str:
 
     words = word.split()
@@ -6,3 +14,22 @@ def word_capitalize(word: str) -> str:
         return ' '.join(list(map(word_capitalize, words)))
 
     return word.capitalize()
+
+
+def currency_format(value: Value) -> Any:
+    if value is None:
+        value = "—"
+    elif isinstance(value, pd.Series):
+        value = value.map('R$ {:,.2f}'.format)
+        value = pd.Series(value, dtype='string')
+        value = value.str.replace('.', ',', regex=False)
+    elif isinstance(value, float):
+        value = f'R$ {value:,.2f}'.replace('.', ',')
+    else:
+        raise TypeError(
+            f"'{str(value)}' is of type {str(type(value))}, which is not an accepted type."  # noqa: E501
+            " value only accepts: pandas.Series, float or None"
+            " Please convert the value to an accepted type."
+        )
+
+    return value